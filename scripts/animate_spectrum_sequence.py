@@ -8,14 +8,25 @@ Descripción:
     - Derecha: Power profile (potencia promedio vs altura)
     - Actualiza cada `update_interval` segundos
     - Guarda cada frame como imagen PNG en 'output_dir'
+
+    render_spectrum_frames() genera las mismas imágenes sin pantalla
+    (backend Agg) y en paralelo con un pool de procesos.
 """
 
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
-from datetime import datetime
-import pytz
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+
+from noise_amisr14 import NoiseEstimator
+from power_amisr14 import to_db
+from read_amisr14_class import to_datetime64, local_labels
+from metrics_amisr14 import get_logger, metrics
+
+log = get_logger("animate_spectrum_sequence")
 
 C = 3e8  # velocidad de la luz (m/s)
 
@@ -29,8 +40,75 @@ def _edges_from_centers(centers):
     return np.concatenate([[first_edge], inner_edges, [last_edge]])
 
 
+def _doppler_axis(nfft, ipp_seconds, radar_freq_hz, xunits):
+    """Eje Doppler centrado (Hz o m/s) y su etiqueta."""
+    freqs = np.fft.fftshift(np.fft.fftfreq(nfft, d=ipp_seconds))
+
+    if xunits.lower() == "m/s":
+        wavelength = C / radar_freq_hz
+        freqs = (wavelength / 2) * freqs
+        xlabel = "Velocidad Doppler (m/s)"
+    else:
+        xlabel = "Frecuencia Doppler (Hz)"
+    return freqs, xlabel
+
+
+def _frame_timestamps(seq, n_frames, block_size, hop=None):
+    """Hora local (Lima) del centro de cada bloque (que empieza cada hop perfiles), como texto."""
+    starts = np.arange(n_frames) * (hop or block_size)
+    counts = np.minimum(block_size, len(seq.utctime) - starts)
+    t0 = float(seq.utctime[0])
+    csum = np.concatenate(([0.0], np.cumsum(np.asarray(seq.utctime, dtype=np.float64) - t0)))
+    mid_times = t0 + (csum[starts + counts] - csum[starts]) / counts
+    return local_labels(to_datetime64(mid_times)).tolist()
+
+
+def _build_figure(fig, freq_edges, height_edges, heights, xlabel, cmap):
+    """
+    Crea los ejes del espectro (izquierda) y del power profile (derecha)
+    sobre `fig`. Devuelve los artistas que se actualizan en cada frame.
+    """
+    gs = fig.add_gridspec(1, 2, width_ratios=[3, 1], wspace=0.1)
+
+    # Gráfico principal (espectro Doppler)
+    ax_spec = fig.add_subplot(gs[0, 0])
+    init_data = np.zeros((len(heights), len(freq_edges) - 1))
+    pcm = ax_spec.pcolormesh(freq_edges, height_edges, init_data,
+                             shading="flat", cmap=cmap, vmin=-80, vmax=-40)
+    fig.colorbar(pcm, ax=ax_spec, label="Potencia (dB)")
+    title = ax_spec.set_title("Espectro Doppler - Inicializando...")
+    ax_spec.set_xlabel(xlabel)
+    ax_spec.set_ylabel("Altura (km)")
+
+    # Gráfico lateral (Power Profile)
+    ax_prof = fig.add_subplot(gs[0, 1], sharey=ax_spec)
+    power_line, = ax_prof.plot(np.zeros_like(heights), heights, color='orange', lw=2)
+    ax_prof.set_xlabel("Potencia Promedio (dB)")
+    ax_prof.grid(True, alpha=0.3)
+    ax_prof.tick_params(labelleft=False)  # evita duplicar etiquetas de altura
+
+    return pcm, power_line, title, ax_prof
+
+
+def _draw_frame(artists, power_db, timestamp, clim):
+    """
+    Actualiza los artistas con el espectro en dB (nFFT, nAlturas) de un canal.
+    clim = (vmin, vmax) viene del NoiseEstimator compartido por la secuencia.
+    """
+    pcm, power_line, title, ax_prof = artists
+    pcm.set_clim(*clim)
+    pcm.set_array(power_db.T.ravel())
+
+    # Power profile (promedio por altura)
+    power_profile = np.mean(power_db, axis=0)
+    power_line.set_xdata(power_profile)
+    ax_prof.set_xlim(np.min(power_profile) - 2, np.max(power_profile) + 2)
+
+    title.set_text(f"Espectro Doppler - {timestamp} (Lima)")
+
+
 def animate_spectrum_sequence(seq, fft_blocks, ipp_seconds, radar_freq_hz,
-                              block_size=64, update_interval=1.0,
+                              block_size=64, hop=None, update_interval=1.0,
                               xunits="m/s", cmap="jet",
                               save_frames=True,
                               output_dir="./outputs/espectros"):
@@ -40,9 +118,11 @@ def animate_spectrum_sequence(seq, fft_blocks, ipp_seconds, radar_freq_hz,
     Parámetros:
         seq : AMISR14Sequence
         fft_blocks : list[np.ndarray]
-        ipp_seconds : float
+        ipp_seconds : float (IPP crudo; se multiplica por seq.n_coh si la
+                      secuencia tiene integración coherente)
         radar_freq_hz : float
         block_size : int
+        hop : int (avance entre bloques si se calcularon solapados)
         update_interval : float (segundos)
         xunits : str ('hz' o 'm/s')
         cmap : str
@@ -51,18 +131,10 @@ def animate_spectrum_sequence(seq, fft_blocks, ipp_seconds, radar_freq_hz,
     """
 
     heights = np.asarray(seq.heightList)
-    tz_local = pytz.timezone("America/Lima")
 
     # --- Eje Doppler ---
     nfft = fft_blocks[0].shape[1]
-    freqs = np.fft.fftshift(np.fft.fftfreq(nfft, d=ipp_seconds))
-
-    if xunits.lower() == "m/s":
-        wavelength = C / radar_freq_hz
-        freqs = (wavelength / 2) * freqs
-        xlabel = "Velocidad Doppler (m/s)"
-    else:
-        xlabel = "Frecuencia Doppler (Hz)"
+    freqs, xlabel = _doppler_axis(nfft, ipp_seconds * seq.n_coh, radar_freq_hz, xunits)
 
     # --- Calcular bordes para pcolormesh ---
     freq_edges = _edges_from_centers(freqs)
@@ -71,58 +143,31 @@ def animate_spectrum_sequence(seq, fft_blocks, ipp_seconds, radar_freq_hz,
     # --- Crear carpeta de salida ---
     if save_frames:
         os.makedirs(output_dir, exist_ok=True)
-        print(f"📂 Carpeta de salida: {os.path.abspath(output_dir)}")
+        log.info(f"📂 Carpeta de salida: {os.path.abspath(output_dir)}")
 
     # --- Crear figura con dos subgráficos (3:1 de proporción) ---
     fig = plt.figure(figsize=(12, 6))
-    gs = fig.add_gridspec(1, 2, width_ratios=[3, 1], wspace=0.1)
-
-    # Gráfico principal (espectro Doppler)
-    ax_spec = fig.add_subplot(gs[0, 0])
-    init_data = np.zeros((len(heights), len(freqs)))
-    pcm = ax_spec.pcolormesh(freq_edges, height_edges, init_data,
-                             shading="flat", cmap=cmap, vmin=-80, vmax=-40)
-    cbar = plt.colorbar(pcm, ax=ax_spec, label="Potencia (dB)")
-    title = ax_spec.set_title("Espectro Doppler - Inicializando...")
-    ax_spec.set_xlabel(xlabel)
-    ax_spec.set_ylabel("Altura (km)")
-
-    # Gráfico lateral (Power Profile)
-    ax_prof = fig.add_subplot(gs[0, 1], sharey=ax_spec)
-    power_line, = ax_prof.plot(np.zeros_like(heights), heights, color='orange', lw=2)
-    ax_prof.set_xlabel("Potencia Promedio (dB)")
-    ax_prof.grid(True, alpha=0.3)
-    ax_prof.tick_params(labelleft=False)  # evita duplicar etiquetas de altura
+    artists = _build_figure(fig, freq_edges, height_edges, heights, xlabel, cmap)
+    pcm, power_line, title, _ = artists
+    timestamps = _frame_timestamps(seq, len(fft_blocks), block_size, hop)
+    noise = NoiseEstimator()
 
     # --- Función de actualización ---
     def update(frame_idx):
         block = fft_blocks[frame_idx]  # (nCanales, nFFT, nAlturas)
-        power_db = 10 * np.log10(np.abs(block[0]) + 1e-12)  # canal 0
-        vmin = np.percentile(power_db, 5)
-        vmax = vmin + 40
-        pcm.set_clim(vmin, vmax)
-        pcm.set_array(power_db.T.ravel())
-
-        # Power profile (promedio por altura)
-        power_profile = np.mean(power_db, axis=0)
-        power_line.set_xdata(power_profile)
-        ax_prof.set_xlim(np.min(power_profile) - 2, np.max(power_profile) + 2)
-
-        # Marca de tiempo local
-        start_idx = frame_idx * block_size
-        end_idx = min(start_idx + block_size, len(seq.utctime))
-        mid_time = np.mean(seq.utctime[start_idx:end_idx])
-        local_time = datetime.utcfromtimestamp(mid_time).replace(
-            tzinfo=pytz.UTC).astimezone(tz_local)
-        timestamp = local_time.strftime("%Y-%m-%d %H:%M:%S")
-
-        title.set_text(f"Espectro Doppler - {timestamp} (Lima)")
+        with metrics.stage("draw_frame") as st:
+            power_db = to_db(block[0])  # canal 0; una sola conversión por frame
+            noise.update_db(power_db)
+            _draw_frame(artists, power_db, timestamps[frame_idx], noise.color_limits(40))
+            st.add(frames=1)
 
         # Guardar frame como imagen
         if save_frames:
             filename = os.path.join(output_dir, f"spectrum_block_{frame_idx:04d}.png")
-            fig.savefig(filename, dpi=150, bbox_inches="tight")
-            print(f"💾 Guardado: {filename}")
+            with metrics.stage("png_write") as st:
+                fig.savefig(filename, dpi=150, bbox_inches="tight")
+                st.add(frames=1)
+            log.info(f"💾 Guardado: {filename}")
 
         return [pcm, power_line, title]
 
@@ -136,3 +181,92 @@ def animate_spectrum_sequence(seq, fft_blocks, ipp_seconds, radar_freq_hz,
 
     plt.tight_layout()
     plt.show()
+
+
+# -------------------------------------------------------------
+# 🔹 Render por lotes sin pantalla (Agg + pool de procesos)
+# -------------------------------------------------------------
+
+_worker = {}  # figura reutilizada por cada proceso del pool
+
+
+def _init_render_worker(freq_edges, height_edges, heights, xlabel, cmap, output_dir, dpi):
+    """Crea una sola figura Agg por proceso (sin pyplot ni pantalla)."""
+    fig = Figure(figsize=(12, 6))
+    _worker["artists"] = _build_figure(fig, freq_edges, height_edges, heights, xlabel, cmap)
+    fig.tight_layout()
+    _worker.update(fig=fig, output_dir=output_dir, dpi=dpi)
+
+
+def _render_frames(frames):
+    """
+    Dibuja y guarda una lista de frames (índice, espectro en dB, marca de tiempo, clim).
+    Devuelve (rutas, segundos dibujando, segundos escribiendo PNG).
+    """
+    filenames = []
+    draw_s = save_s = 0.0
+    for frame_idx, power_db, timestamp, clim in frames:
+        t0 = time.perf_counter()
+        _draw_frame(_worker["artists"], power_db, timestamp, clim)
+        t1 = time.perf_counter()
+        filename = os.path.join(_worker["output_dir"], f"spectrum_block_{frame_idx:04d}.png")
+        _worker["fig"].savefig(filename, dpi=_worker["dpi"])
+        save_s += time.perf_counter() - t1
+        draw_s += t1 - t0
+        filenames.append(filename)
+    return filenames, draw_s, save_s
+
+
+def render_spectrum_frames(seq, fft_blocks, ipp_seconds, radar_freq_hz,
+                           block_size=64, hop=None, xunits="m/s", cmap="jet",
+                           output_dir="./outputs/espectros", workers=None,
+                           channel=0, dpi=150, frames_per_task=16):
+    """
+    Guarda los espectros Doppler como imágenes PNG sin pantalla.
+
+    Cada proceso del pool crea una única figura (backend Agg) y para cada
+    frame solo actualiza los datos del pcolormesh, el título y el power
+    profile. Los nombres de archivo coinciden con animate_spectrum_sequence.
+
+    Parámetros:
+        (los mismos que animate_spectrum_sequence, más)
+        workers : int (procesos; por defecto os.cpu_count())
+        channel : int (índice del canal en cada bloque)
+        dpi : int
+        frames_per_task : int (frames enviados a un proceso por tarea)
+
+    Devuelve:
+        Lista de rutas de las imágenes guardadas, en orden.
+    """
+    heights = np.asarray(seq.heightList)
+    nfft = fft_blocks[0].shape[1]
+    freqs, xlabel = _doppler_axis(nfft, ipp_seconds * seq.n_coh, radar_freq_hz, xunits)
+    freq_edges = _edges_from_centers(freqs)
+    height_edges = _edges_from_centers(heights)
+
+    os.makedirs(output_dir, exist_ok=True)
+    log.info(f"📂 Carpeta de salida: {os.path.abspath(output_dir)}")
+
+    timestamps = _frame_timestamps(seq, len(fft_blocks), block_size, hop)
+
+    # Piso de ruido acumulado frame a frame (mismas escalas que la animación).
+    # Cada espectro se convierte a dB una sola vez; los procesos solo dibujan.
+    noise = NoiseEstimator()
+    frames = []
+    for i in range(len(fft_blocks)):
+        power_db = to_db(fft_blocks[i][channel])
+        noise.update_db(power_db)
+        frames.append((i, power_db, timestamps[i], noise.color_limits(40)))
+    tasks = [frames[i:i + frames_per_task] for i in range(0, len(frames), frames_per_task)]
+
+    filenames = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(freq_edges, height_edges, heights, xlabel,
+                                       cmap, output_dir, dpi)) as pool:
+        for names, draw_s, save_s in pool.map(_render_frames, tasks):
+            filenames.extend(names)
+            metrics.record("draw_frame", draw_s, frames=len(names))
+            metrics.record("png_write", save_s, frames=len(names))
+
+    log.info(f"💾 {len(filenames)} imágenes guardadas en {output_dir}")
+    return filenames
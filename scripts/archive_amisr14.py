@@ -0,0 +1,131 @@
+"""
+Script: archive_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Reempaqueta una carpeta de archivos D*.hdf5 del radar AMISR-14 en un
+    único archivo HDF5 por bloques (chunks), opcionalmente comprimido,
+    pensado para noches archivadas que se analizan varias veces.
+
+    Los archivos de adquisición guardan cada canal como un dataset 2-D
+    separado (Data/data_pre/channelNN), lo que obliga a una lectura por
+    canal y por archivo sin control sobre el layout. El archivo
+    reempaquetado contiene:
+        Data/voltages       -> (nCanales, nPerfiles, nAlturas) contiguo, o por
+                               bloques de chunk_profiles perfiles de un canal
+                               si se comprime
+        Data/channels       -> (nCanales,) números de canal
+        Data/utctime        -> (nPerfiles,) segundos UTC
+        Metadata/heightList -> (nAlturas,) en metros
+
+    read_amisr14_file y AMISR14Sequence leen ambos formatos sin cambios
+    (ver read_amisr14_class.channel_reader); a AMISR14Sequence se le puede
+    pasar directamente la ruta del archivo reempaquetado.
+
+    La compresión es opcional: los voltajes dominados por ruido casi no se
+    comprimen y descomprimir cuesta más que leer desde un disco local. Con
+    lzf/gzip el archivo ocupa menos, lo que conviene en discos lentos o
+    remotos. Sin compresión Data/voltages es contiguo: cada lectura de
+    bloque es un solo hiperslab para todos los canales, sin índice de
+    chunks, y con workers > 1 se puede mapear en memoria.
+
+Uso:
+    python archive_amisr14.py --folder /ruta/datos --output noche.h5 --channels 0 4
+    python archive_amisr14.py --folder /ruta/datos --output noche.h5 --compression lzf
+    seq = AMISR14Sequence("noche.h5", lazy=True)
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import h5py
+import numpy as np
+
+from read_amisr14_class import ARCHIVE_CHANNELS, ARCHIVE_DATASET, list_channels
+from power_amisr14 import DTYPE
+from metrics_amisr14 import get_logger
+
+log = get_logger("archive_amisr14")
+
+ARCHIVE_FORMAT = "amisr14-archive"
+ARCHIVE_VERSION = 1
+
+
+def convert_folder(folder_path, output_path, channels=None, pattern="*.hdf5",
+                   chunk_profiles=512, compression=None, compression_opts=None,
+                   t_start=None, t_end=None, h_min=None, h_max=None, dtype=DTYPE):
+    """
+    Escribe los archivos de folder_path (en orden temporal) en un único
+    archivo reempaquetado y devuelve su número de perfiles.
+
+    Parámetros:
+        channels : list[int] -> canales a guardar (por defecto todos)
+        pattern : str -> patrón de los archivos de entrada
+        chunk_profiles : int -> perfiles por bloque (chunk) de Data/voltages
+                         (solo con compresión) y por escritura
+        compression : str -> None (por defecto), 'lzf' (rápida) o 'gzip'
+        compression_opts : int -> nivel de gzip
+        t_start, t_end, h_min, h_max -> recorte en tiempo (s UTC) y alturas (km)
+        dtype : tipo numpy -> precisión de los voltajes guardados
+    """
+    from process_amisr14_sequence import AMISR14Sequence
+
+    files = sorted(glob.glob(os.path.join(folder_path, pattern)))
+    if channels is None and files:
+        with h5py.File(files[0], "r") as f:
+            channels = list_channels(f)
+    seq = AMISR14Sequence(folder_path, channels=channels, lazy=True, pattern=pattern,
+                          t_start=t_start, t_end=t_end, h_min=h_min, h_max=h_max, dtype=dtype)
+    if os.path.abspath(output_path) in {os.path.abspath(p) for p in seq.files}:
+        raise ValueError(f"El archivo de salida {output_path} coincide con uno de entrada")
+    n_channels, n_profiles, n_heights = len(seq.channels), len(seq.utctime), len(seq.heightList)
+    chunk_profiles = min(chunk_profiles, n_profiles)
+
+    log.info(f"🗜️ Reempaquetando {len(seq.files)} archivos en {output_path} "
+             f"({n_channels} canales, {n_profiles} perfiles, {n_heights} alturas)")
+    t0 = time.perf_counter()
+    with h5py.File(output_path, "w") as f:
+        ds = f.create_dataset(ARCHIVE_DATASET, shape=(n_channels, n_profiles, n_heights),
+                              dtype=dtype,
+                              chunks=None if compression is None else (1, chunk_profiles, n_heights),
+                              compression=compression, compression_opts=compression_opts,
+                              shuffle=compression is not None)
+        f[ARCHIVE_CHANNELS] = np.asarray(seq.channels, dtype=np.int32)
+        f["Data/utctime"] = seq.utctime
+        f["Metadata/heightList"] = seq.heightList
+        f.attrs["format"] = ARCHIVE_FORMAT
+        f.attrs["version"] = ARCHIVE_VERSION
+        f.attrs["source_files"] = [os.path.basename(p) for p in seq.files]
+        f.attrs["source_profiles"] = [p1 - p0 for p0, p1 in seq._profiles]
+
+        start = 0
+        for block in seq.iter_blocks(chunk_profiles, partial=True):
+            m = block.shape[1]
+            ds[:, start:start + m, :] = block
+            start += m
+        size_in = sum(os.path.getsize(p) for p in seq.files)
+
+    elapsed = time.perf_counter() - t0
+    size_out = os.path.getsize(output_path)
+    log.info(f"✅ {start} perfiles en {elapsed:.2f} s "
+             f"({size_in / 1e6:.1f} MB -> {size_out / 1e6:.1f} MB)",
+             extra={"fields": {"profiles": start, "seconds": elapsed,
+                               "bytes_in": size_in, "bytes_out": size_out}})
+    return start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reempaqueta archivos D*.hdf5 AMISR-14 en un único HDF5.")
+    parser.add_argument("--folder", required=True, help="Carpeta con los archivos .hdf5")
+    parser.add_argument("--output", required=True, help="Archivo HDF5 de salida")
+    parser.add_argument("--channels", type=int, nargs="+", default=None, help="Canales a guardar")
+    parser.add_argument("--pattern", default="*.hdf5", help="Patrón de los archivos de entrada")
+    parser.add_argument("--chunk-profiles", type=int, default=512, help="Perfiles por chunk")
+    parser.add_argument("--compression", default="none", choices=["lzf", "gzip", "none"],
+                        help="Compresión de Data/voltages")
+    args = parser.parse_args()
+
+    convert_folder(args.folder, args.output, channels=args.channels, pattern=args.pattern,
+                   chunk_profiles=args.chunk_profiles,
+                   compression=None if args.compression == "none" else args.compression)
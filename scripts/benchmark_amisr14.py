@@ -0,0 +1,178 @@
+"""
+Script: benchmark_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Mide el rendimiento de la cadena de procesamiento AMISR-14 sobre datos
+    sintéticos (ver synth_amisr14.py) de varios tamaños:
+
+        read_file       -> read_amisr14_file (un archivo, todos los canales)
+        load_sequence   -> AMISR14Sequence (carga completa en memoria)
+        load_archive    -> igual, desde el archivo reempaquetado (archive_amisr14)
+        fft_blocks      -> process_by_blocks("getFFT")
+        fft_batched     -> process_by_blocks("getFFT", batched=True)
+        fft_overlap     -> igual, con bloques solapados al 75 % y ventana de Hann
+        power_blocks    -> process_by_blocks("getPower")
+        build_rti       -> build_rti sobre una secuencia lazy
+        render_frames   -> render_spectrum_frames (PNG sin pantalla)
+
+    Cada etapa se repite --repeat veces y se reporta el mejor tiempo, junto
+    con el volumen de datos de entrada y el throughput. Los mensajes de los
+    módulos se silencian durante las mediciones. Con --output los resultados
+    se guardan en JSON para comparar entre versiones.
+
+Uso:
+    python benchmark_amisr14.py --sizes small medium --repeat 3 --output bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+from synth_amisr14 import write_synthetic_files
+from read_amisr14_class import read_amisr14_file
+from process_amisr14_sequence import AMISR14Sequence
+from rti_amisr14 import build_rti
+from animate_spectrum_sequence import render_spectrum_frames
+from archive_amisr14 import convert_folder
+from metrics_amisr14 import LOGGER_NAME, metrics
+
+# Tamaños de prueba (forma de los datos sintéticos)
+SIZES = {
+    "small":  dict(n_files=2, n_channels=1, n_profiles=1000, n_heights=200),
+    "medium": dict(n_files=4, n_channels=2, n_profiles=2500, n_heights=400),
+    "large":  dict(n_files=8, n_channels=2, n_profiles=5000, n_heights=800),
+}
+
+BLOCK_SIZE = 64
+IPP_SECONDS = 0.005
+RADAR_FREQ_HZ = 440e6
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silencia los mensajes informativos de los módulos durante una medición."""
+    logger = logging.getLogger(LOGGER_NAME)
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def _best_time(fn, repeat):
+    """Ejecuta fn() repeat veces (sin mensajes) y devuelve (mejor tiempo, último resultado)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        with _quiet():
+            t0 = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run_size(name, shape, workdir, repeat=3, n_frames=32):
+    """Genera los datos de un tamaño y mide cada etapa. Devuelve una lista de filas."""
+    folder = os.path.join(workdir, name)
+    with _quiet():
+        files = write_synthetic_files(folder, **shape)
+    total_mb = shape["n_files"] * shape["n_channels"] * shape["n_profiles"] * shape["n_heights"] * 8 / 1e6
+    file_mb = total_mb / shape["n_files"]
+
+    rows = []
+
+    def measure(stage, mb, fn):
+        seconds, result = _best_time(fn, repeat)
+        rows.append((stage, seconds, mb))
+        return result
+
+    channels = list(range(shape["n_channels"]))
+    measure("read_file", file_mb, lambda: read_amisr14_file(files[0], channels=channels))
+    seq = measure("load_sequence", total_mb, lambda: AMISR14Sequence(folder, channels=channels))
+    archive = os.path.join(workdir, f"{name}_archive.h5")
+    with _quiet():
+        convert_folder(folder, archive)
+    measure("load_archive", total_mb, lambda: AMISR14Sequence(archive, channels=channels))
+    measure("fft_blocks", total_mb,
+            lambda: seq.process_by_blocks("getFFT", BLOCK_SIZE, nfft=BLOCK_SIZE))
+    fft_blocks = measure("fft_batched", total_mb,
+                         lambda: seq.process_by_blocks("getFFT", BLOCK_SIZE, batched=True, nfft=BLOCK_SIZE))
+    measure("fft_overlap", total_mb,
+            lambda: seq.process_by_blocks("getFFT", BLOCK_SIZE, batched=True, hop=BLOCK_SIZE // 4,
+                                          nfft=BLOCK_SIZE, window="hann"))
+    measure("power_blocks", total_mb, lambda: seq.process_by_blocks("getPower", BLOCK_SIZE))
+
+    with _quiet():
+        lazy_seq = AMISR14Sequence(folder, channels=channels, lazy=True)
+    measure("build_rti", total_mb / shape["n_channels"], lambda: build_rti(lazy_seq, n_columns=1200))
+
+    frames = fft_blocks[:n_frames]
+    frames_dir = os.path.join(workdir, f"{name}_frames")
+    measure("render_frames", None,
+            lambda: render_spectrum_frames(seq, frames, IPP_SECONDS, RADAR_FREQ_HZ,
+                                           block_size=BLOCK_SIZE, output_dir=frames_dir))
+
+    results = []
+    for stage, seconds, mb in rows:
+        row = {"size": name, "stage": stage, "seconds": seconds, **shape}
+        if mb is not None:
+            row["mb"] = mb
+            row["mb_per_s"] = mb / seconds
+        else:
+            row["frames"] = len(frames)
+            row["frames_per_s"] = len(frames) / seconds
+        results.append(row)
+    return results
+
+
+def print_table(results):
+    print(f"\n{'tamaño':<8} {'etapa':<15} {'tiempo (s)':>11} {'throughput':>16}")
+    print("-" * 53)
+    for r in results:
+        rate = f"{r['mb_per_s']:.1f} MB/s" if "mb_per_s" in r else f"{r['frames_per_s']:.1f} frames/s"
+        print(f"{r['size']:<8} {r['stage']:<15} {r['seconds']:>11.4f} {rate:>16}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la cadena AMISR-14 con datos sintéticos.")
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=list(SIZES),
+                        help="Tamaños a medir")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por etapa (mejor tiempo)")
+    parser.add_argument("--frames", type=int, default=32, help="Frames a renderizar")
+    parser.add_argument("--workdir", default=None, help="Carpeta para los datos (por defecto temporal)")
+    parser.add_argument("--output", default=None, help="Archivo JSON con los resultados")
+    parser.add_argument("--metrics", default=None,
+                        help="Reporte por etapa (metrics_amisr14) en JSON o CSV según la extensión")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="amisr14_bench_")
+    results = []
+    try:
+        for name in args.sizes:
+            print(f"⏱️ Midiendo tamaño '{name}': {SIZES[name]}")
+            results.extend(run_size(name, SIZES[name], workdir, args.repeat, args.frames))
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Resultados guardados en {args.output}")
+    if args.metrics:
+        metrics.log_summary()
+        if args.metrics.endswith(".csv"):
+            metrics.to_csv(args.metrics)
+        else:
+            metrics.to_json(args.metrics)
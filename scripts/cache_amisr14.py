@@ -0,0 +1,117 @@
+"""
+Script: cache_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Caché en disco para productos derivados (espectros, potencia, RTI) del
+    radar AMISR-14.
+
+    Cada resultado se identifica por un hash del conjunto de archivos de
+    entrada (ruta, mtime y tamaño), de la configuración de lectura y de la
+    operación con sus parámetros (block_size, nfft, canales, ...). Si algún
+    archivo cambia, el hash cambia y el resultado se vuelve a calcular.
+
+    Los resultados se guardan en HDF5 chunked (un chunk por bloque) en
+    cache_dir/<hash>.h5. Las entradas se eliminan por antigüedad (max_age_days)
+    y, si el total supera max_bytes, empezando por las menos usadas.
+
+Uso:
+    seq = AMISR14Sequence(folder, cache="./cache")
+    fft_blocks = seq.process_by_blocks("getFFT", block_size=64, nfft=64)
+"""
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from metrics_amisr14 import get_logger
+
+log = get_logger("cache_amisr14")
+
+
+class ResultCache:
+    """Caché de resultados de process_by_blocks direccionada por contenido."""
+
+    def __init__(self, cache_dir, max_bytes=None, max_age_days=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(files, config):
+        """
+        Hash SHA-256 de los archivos de entrada (ruta, mtime, tamaño) y de un
+        dict de configuración serializable a JSON.
+        """
+        h = hashlib.sha256()
+        for path in files:
+            st = os.stat(path)
+            h.update(f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}\n".encode())
+        h.update(json.dumps(config, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.h5")
+
+    def load(self, key):
+        """Devuelve el resultado guardado (lista o ndarray) o None si no existe."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with h5py.File(path, "r") as f:
+            ds = f["result"]
+            result = ds[...]
+            as_list = bool(ds.attrs.get("as_list", False))
+        os.utime(path)  # marca de uso para el desalojo
+        log.info(f"♻️ Resultado leído de la caché: {path}")
+        return list(result) if as_list else result
+
+    def store(self, key, result):
+        """Guarda una lista de arreglos de igual forma o un ndarray."""
+        as_list = isinstance(result, list)
+        if as_list:
+            if not result:
+                return
+            result = np.stack(result)
+        path = self._path(key)
+        # Archivo temporal único: dos procesos con la misma clave no se pisan
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            with h5py.File(tmp_path, "w") as f:
+                chunked = result.ndim > 1 and result.shape[0] > 0  # un resultado vacío no admite chunks
+                ds = f.create_dataset("result", data=result,
+                                      chunks=(1,) + result.shape[1:] if chunked else None)
+                ds.attrs["as_list"] = as_list
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    def evict(self):
+        """Elimina entradas por antigüedad y, si hace falta, por tamaño total."""
+        entries = []
+        now = time.time()
+        for path in glob.glob(os.path.join(self.cache_dir, "*.h5")):
+            st = os.stat(path)
+            if self.max_age_days is not None and now - st.st_mtime > self.max_age_days * 86400:
+                os.remove(path)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        if self.max_bytes is None:
+            return
+        entries.sort()  # las menos usadas primero
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
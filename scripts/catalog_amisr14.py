@@ -0,0 +1,157 @@
+"""
+Script: catalog_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Catálogo persistente (SQLite) de los archivos HDF5 del radar AMISR-14.
+
+    Por cada archivo guarda: ruta, mtime, tamaño, número de perfiles y de
+    alturas, primer y último utctime, canales presentes y un hash de
+    heightList. El catálogo se crea una vez junto a los datos y se actualiza
+    de forma incremental: solo se vuelven a abrir los archivos nuevos o
+    modificados. Así se conoce la forma de la secuencia sin leer los datos,
+    y las consultas por ventana de tiempo solo tocan los archivos que se
+    solapan con ella.
+
+Uso:
+    python catalog_amisr14.py --folder /ruta/a/los/datos
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import sqlite3
+
+import h5py
+
+from read_amisr14_class import list_channels, read_heights, channel_datasets
+from metrics_amisr14 import get_logger
+
+log = get_logger("catalog_amisr14")
+
+CATALOG_NAME = ".amisr14_catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path        TEXT PRIMARY KEY,
+    mtime       REAL NOT NULL,
+    size        INTEGER NOT NULL,
+    n_profiles  INTEGER NOT NULL,
+    n_heights   INTEGER NOT NULL,
+    t_first     REAL NOT NULL,
+    t_last      REAL NOT NULL,
+    channels    TEXT NOT NULL,
+    height_hash TEXT NOT NULL
+)
+"""
+
+_COLUMNS = ("path", "mtime", "size", "n_profiles", "n_heights",
+            "t_first", "t_last", "channels", "height_hash")
+
+
+def _read_entry(file_path):
+    """Lee los metadatos de un archivo (sin leer los voltajes)."""
+    st = os.stat(file_path)
+    with h5py.File(file_path, "r") as f:
+        channels = list_channels(f)
+        n_profiles, n_heights = channel_datasets(f, channels[:1])[0].shape
+        utctime = f["Data/utctime"]
+        t_first = float(utctime[0])
+        t_last = float(utctime[-1])
+        heights = read_heights(f)
+    return {
+        "path": os.path.abspath(file_path),
+        "mtime": st.st_mtime,
+        "size": st.st_size,
+        "n_profiles": n_profiles,
+        "n_heights": n_heights,
+        "t_first": t_first,
+        "t_last": t_last,
+        "channels": ",".join(str(ch) for ch in channels),
+        "height_hash": hashlib.sha1(heights.tobytes()).hexdigest(),
+    }
+
+
+class FileCatalog:
+    """Índice persistente de los archivos *.hdf5 de una carpeta."""
+
+    def __init__(self, folder_path, pattern="*.hdf5", db_path=None):
+        self.folder_path = folder_path
+        self.pattern = pattern
+        self.db_path = db_path or os.path.join(folder_path, CATALOG_NAME)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute(_SCHEMA)
+
+    def update(self):
+        """
+        Sincroniza el catálogo con la carpeta: agrega archivos nuevos,
+        vuelve a leer los modificados (mtime o tamaño) y elimina los borrados.
+        Devuelve el número de archivos (re)leídos.
+        """
+        files = [os.path.abspath(p) for p in glob.glob(os.path.join(self.folder_path, self.pattern))]
+        known = {row[0]: (row[1], row[2])
+                 for row in self.conn.execute("SELECT path, mtime, size FROM files")}
+
+        changed = []
+        for path in files:
+            st = os.stat(path)
+            if known.get(path) != (st.st_mtime, st.st_size):
+                changed.append(path)
+
+        removed = set(known) - set(files)
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in removed])
+            for path in changed:
+                entry = _read_entry(path)
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO files ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    [entry[c] for c in _COLUMNS])
+
+        if changed or removed:
+            log.info(f"🗂️ Catálogo actualizado: {len(changed)} archivo(s) leídos, {len(removed)} eliminados")
+        return len(changed)
+
+    def entries(self, t_start=None, t_end=None):
+        """
+        Devuelve las entradas ordenadas por ruta (orden temporal) como lista
+        de dicts. Con t_start/t_end (segundos UTC) solo se devuelven los
+        archivos que se solapan con la ventana.
+        """
+        query = f"SELECT {', '.join(_COLUMNS)} FROM files"
+        conditions, params = [], []
+        if t_start is not None:
+            conditions.append("t_last >= ?")
+            params.append(t_start)
+        if t_end is not None:
+            conditions.append("t_first <= ?")
+            params.append(t_end)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY path"
+
+        result = []
+        for row in self.conn.execute(query, params):
+            entry = dict(zip(_COLUMNS, row))
+            entry["channels"] = [int(ch) for ch in entry["channels"].split(",")]
+            result.append(entry)
+        return result
+
+    def files_in_window(self, t_start=None, t_end=None):
+        """Rutas de los archivos que se solapan con [t_start, t_end]."""
+        return [e["path"] for e in self.entries(t_start, t_end)]
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crea o actualiza el catálogo de archivos AMISR-14.")
+    parser.add_argument("--folder", required=True, help="Carpeta con los archivos .hdf5")
+    args = parser.parse_args()
+
+    catalog = FileCatalog(args.folder)
+    catalog.update()
+    entries = catalog.entries()
+    print(f"✅ {len(entries)} archivos, {sum(e['n_profiles'] for e in entries)} perfiles en el catálogo")
+    catalog.close()
@@ -0,0 +1,128 @@
+"""
+Script: decode_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Decodificación de pulsos codificados (Barker o complementarios) para los
+    voltajes crudos del radar AMISR-14.
+
+    La decodificación es un filtro acoplado a lo largo del eje de alturas,
+    calculado como correlación por FFT sobre todos los perfiles y canales a
+    la vez. Con códigos complementarios cada perfil usa el código
+    code[perfil % nCodigos]; los lóbulos laterales se cancelan al integrar
+    coherentemente (n_coh múltiplo del número de códigos).
+
+    Salida: (nCanales, nPerfiles, nAlturas - nBaudios * samples_per_baud + 1)
+    La altura de cada muestra decodificada es la del inicio del pulso, por lo
+    que heightList se recorta con Decoder.trim_heights().
+
+Uso:
+    decoder = Decoder(barker_code(13))
+    decoded = decoder(block)              # block (nCanales, nPerfiles, nAlturas)
+"""
+
+import numpy as np
+
+try:
+    import scipy.fft as scipy_fft  # FFT multihilo opcional
+except ImportError:
+    scipy_fft = None
+
+
+BARKER_CODES = {
+    2: [1, -1],
+    3: [1, 1, -1],
+    4: [1, 1, -1, 1],
+    5: [1, 1, 1, -1, 1],
+    7: [1, 1, 1, -1, -1, 1, -1],
+    11: [1, 1, 1, -1, -1, -1, 1, -1, -1, 1, -1],
+    13: [1, 1, 1, 1, 1, -1, -1, 1, 1, -1, 1, -1, 1],
+}
+
+
+def barker_code(n_bauds):
+    """Código Barker de n_bauds baudios, forma (1, n_bauds)."""
+    if n_bauds not in BARKER_CODES:
+        raise ValueError(f"No existe código Barker de {n_bauds} baudios "
+                         f"(disponibles: {sorted(BARKER_CODES)})")
+    return np.array([BARKER_CODES[n_bauds]], dtype=np.float32)
+
+
+def complementary_code(n_bauds):
+    """
+    Par de códigos complementarios (Golay) de n_bauds baudios, forma (2, n_bauds).
+    n_bauds debe ser potencia de 2.
+    """
+    if n_bauds < 1 or n_bauds & (n_bauds - 1):
+        raise ValueError(f"n_bauds debe ser potencia de 2 (recibido {n_bauds})")
+    a = np.array([1.0])
+    b = np.array([1.0])
+    while len(a) < n_bauds:
+        a, b = np.concatenate([a, b]), np.concatenate([a, -b])
+    return np.vstack([a, b]).astype(np.float32)
+
+
+class Decoder:
+    """Filtro acoplado por FFT para un código de transmisión."""
+
+    def __init__(self, code, samples_per_baud=1, workers=None):
+        """
+        Parámetros:
+            code : array (nCodigos, nBaudios) o (nBaudios,)
+            samples_per_baud : int -> muestras de altura por baudio
+            workers : int -> hilos para scipy.fft (si está instalado)
+        """
+        code = np.atleast_2d(np.asarray(code, dtype=np.float32))
+        self.code = np.repeat(code, samples_per_baud, axis=1)  # (nCodigos, nMuestras)
+        self.n_codes, self.code_len = self.code.shape
+        self.workers = workers
+        self._filters = {}  # n_fft -> conj(FFT(código)) precalculado
+
+    def n_heights_out(self, n_heights):
+        """Número de alturas que quedan después de decodificar."""
+        return n_heights - self.code_len + 1
+
+    def trim_heights(self, heightList):
+        """Recorta heightList de forma consistente con la salida decodificada."""
+        return heightList[:self.n_heights_out(len(heightList))]
+
+    def _filter(self, n_fft):
+        if n_fft not in self._filters:
+            self._filters[n_fft] = np.conj(np.fft.fft(self.code, n=n_fft, axis=1)).astype(np.complex64)
+        return self._filters[n_fft]
+
+    def __call__(self, data, first_profile=0):
+        """
+        Decodifica un bloque (nCanales, nPerfiles, nAlturas).
+
+        first_profile es el índice global del primer perfil del bloque, para
+        elegir el código correcto con códigos complementarios.
+        """
+        n_channels, n_profiles, n_heights = data.shape
+        n_out = self.n_heights_out(n_heights)
+        if n_out < 1:
+            raise ValueError(f"El código ({self.code_len} muestras) es más largo que "
+                             f"el número de alturas ({n_heights})")
+
+        n_fft = n_heights + self.code_len - 1
+        if scipy_fft is not None:
+            n_fft = scipy_fft.next_fast_len(n_fft)
+
+        which = (first_profile + np.arange(n_profiles)) % self.n_codes
+        filt = self._filter(n_fft)[which]  # (nPerfiles, n_fft)
+
+        spec = _fft(data, n_fft, self.workers)
+        spec *= filt
+        decoded = _ifft(spec, self.workers)[:, :, :n_out]
+        return decoded.astype(data.dtype, copy=False)
+
+
+def _fft(x, n, workers):
+    if workers is not None and scipy_fft is not None:
+        return scipy_fft.fft(x, n=n, axis=2, workers=workers)
+    return np.fft.fft(x, n=n, axis=2)
+
+
+def _ifft(x, workers):
+    if workers is not None and scipy_fft is not None:
+        return scipy_fft.ifft(x, axis=2, workers=workers, overwrite_x=True)
+    return np.fft.ifft(x, axis=2)
@@ -0,0 +1,69 @@
+"""
+Script: follow_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Modo seguimiento (tiempo real) para campañas del radar AMISR-14.
+    Vigila la carpeta de adquisición y, a medida que se cierran nuevos
+    archivos D*.hdf5, calcula los espectros integrados y agrega las columnas
+    RTI (potencia media por altura) a un archivo HDF5 de salida.
+
+    Estructura de salida:
+        utctime    -> (nColumnas,)
+        power      -> (nColumnas, nCanales, nAlturas)
+        heightList -> (nAlturas,) en km
+
+Uso:
+    python follow_amisr14.py --folder /ruta/adquisicion --output rti_live.h5
+"""
+
+import argparse
+
+import h5py
+import numpy as np
+
+from process_amisr14_sequence import AMISR14Sequence
+from metrics_amisr14 import get_logger
+
+log = get_logger("follow_amisr14")
+
+
+def follow_to_hdf5(seq, output_path, block_size=64, nfft=None, n_incoh=1, **follow_kwargs):
+    """Agrega cada columna RTI producida por seq.follow() al archivo de salida."""
+    n_channels = len(seq.channels)
+    n_heights = len(seq.heightList)
+
+    with h5py.File(output_path, "a") as f:
+        if "power" not in f:
+            f.create_dataset("utctime", shape=(0,), maxshape=(None,), dtype="f8", chunks=(1024,))
+            f.create_dataset("power", shape=(0, n_channels, n_heights),
+                             maxshape=(None, n_channels, n_heights), dtype="f4",
+                             chunks=(64, n_channels, n_heights))
+            f["heightList"] = np.asarray(seq.heightList) / 1000.0
+
+        ds_time, ds_power = f["utctime"], f["power"]
+        for prod in seq.follow(block_size, nfft=nfft, n_incoh=n_incoh, **follow_kwargs):
+            n = ds_time.shape[0]
+            ds_time.resize((n + 1,))
+            ds_power.resize((n + 1, n_channels, n_heights))
+            ds_time[n] = prod["utctime"]
+            ds_power[n] = prod["power"]
+            f.flush()
+
+            peak_db = 10 * np.log10(np.max(prod["power"]) + 1e-12)
+            log.info(f"📈 Columna {n}: pico {peak_db:.1f} dB, latencia {prod['latency']:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procesa archivos AMISR-14 a medida que llegan.")
+    parser.add_argument("--folder", required=True, help="Carpeta de adquisición")
+    parser.add_argument("--output", required=True, help="Archivo HDF5 de salida (columnas RTI)")
+    parser.add_argument("--channels", type=int, nargs="+", default=None, help="Canales a procesar")
+    parser.add_argument("--block-size", type=int, default=64, help="Perfiles por bloque")
+    parser.add_argument("--n-incoh", type=int, default=1, help="Bloques integrados por columna")
+    parser.add_argument("--poll", type=float, default=2.0, help="Segundos entre revisiones")
+    parser.add_argument("--from-start", action="store_true", help="Procesa también los archivos existentes")
+    args = parser.parse_args()
+
+    seq = AMISR14Sequence(args.folder, channels=args.channels, lazy=True)
+    follow_to_hdf5(seq, args.output, block_size=args.block_size, n_incoh=args.n_incoh,
+                   poll_interval=args.poll, from_start=args.from_start)
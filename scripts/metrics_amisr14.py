@@ -0,0 +1,233 @@
+"""
+Script: metrics_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Instrumentación y logging de la cadena de procesamiento AMISR-14.
+
+    - Logging: todos los módulos escriben en el logger "amisr14" (en lugar de
+      print). Por defecto los mensajes salen por stdout tal como antes; con
+      setup_logging(json_lines=True) cada línea es un objeto JSON con el
+      mensaje y los campos estructurados (extra={"fields": {...}}).
+
+    - Métricas: `metrics` acumula, por etapa (lectura, FFT, dB, PNG, ...),
+      número de llamadas, tiempo, contadores (bytes, perfiles, bloques,
+      frames) y memoria pico del proceso. Está desactivado por defecto: en
+      ese caso metrics.stage() devuelve un objeto vacío compartido y no se
+      mide nada. Se activa con metrics.enable() o con la variable de
+      entorno AMISR14_METRICS=1.
+
+Uso:
+    from metrics_amisr14 import metrics
+    metrics.enable()
+    seq = AMISR14Sequence(folder)
+    seq.process_by_blocks("getFFT", block_size=64)
+    metrics.log_summary()
+    metrics.to_json("reporte.json")      # o metrics.to_csv("reporte.csv")
+"""
+
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource  # memoria pico (Unix)
+except ImportError:
+    resource = None
+
+LOGGER_NAME = "amisr14"
+
+# Contadores con tasa por segundo en el reporte
+_RATES = ("bytes", "profiles", "blocks", "frames")
+
+
+def get_logger(name):
+    """Logger hijo de 'amisr14' para un módulo (p. ej. get_logger(__name__))."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class _JSONFormatter(logging.Formatter):
+    """Una línea JSON por mensaje, con los campos de extra={"fields": {...}}."""
+
+    def format(self, record):
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level=logging.INFO, json_lines=False, stream=None):
+    """
+    (Re)configura el logger 'amisr14'. Por defecto: mensajes tal cual por
+    stdout, como los antiguos print. json_lines=True emite JSON por línea.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(_JSONFormatter() if json_lines else logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+if not logging.getLogger(LOGGER_NAME).handlers:
+    setup_logging()
+
+log = get_logger("metrics")
+
+
+def _peak_rss_mb():
+    """Memoria residente pico del proceso en MB (None si no está disponible)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3  # bytes en macOS, KB en Linux
+
+
+class _NullStage:
+    """Etapa vacía usada con las métricas desactivadas."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, **counters):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Cronómetro de una llamada a una etapa."""
+    __slots__ = ("metrics", "name", "counters", "t0")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.counters = {}
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.t0, **self.counters)
+        return False
+
+    def add(self, **counters):
+        """Suma contadores (bytes, profiles, blocks, frames, ...) a esta llamada."""
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+class Metrics:
+    """Acumulador de tiempos y contadores por etapa."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Borra todas las etapas y reinicia el reloj del reporte."""
+        self.stages = {}
+        self.t_start = time.perf_counter()
+
+    def stage(self, name):
+        """
+        Context manager que mide una llamada a la etapa `name`:
+            with metrics.stage("fft") as st:
+                ...
+                st.add(blocks=1, bytes=x.nbytes)
+        Con las métricas desactivadas no mide nada.
+        Las etapas medidas desde varios hilos suman el tiempo de cada hilo.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name, seconds, **counters):
+        """Registra una llamada ya medida (p. ej. en un proceso del pool)."""
+        if not self.enabled:
+            return
+        peak = _peak_rss_mb()
+        with self._lock:
+            st = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+            st["calls"] += 1
+            st["seconds"] += seconds
+            for key, value in counters.items():
+                st[key] = st.get(key, 0) + value
+            if peak is not None:
+                st["peak_rss_mb"] = max(st.get("peak_rss_mb", 0.0), peak)
+
+    def report(self):
+        """Lista de filas (dict) por etapa, con tasas por segundo."""
+        rows = []
+        with self._lock:
+            for name, st in self.stages.items():
+                row = {"stage": name, **st}
+                for key in _RATES:
+                    if key in st and st["seconds"] > 0:
+                        row[f"{key}_per_s"] = st[key] / st["seconds"]
+                if "bytes" in st:
+                    row["mb_per_s"] = row.get("bytes_per_s", 0.0) / 1e6
+                rows.append(row)
+        return rows
+
+    def summary(self):
+        """Reporte completo: duración total, memoria pico y filas por etapa."""
+        return {
+            "wall_seconds": time.perf_counter() - self.t_start,
+            "peak_rss_mb": _peak_rss_mb(),
+            "stages": self.report(),
+        }
+
+    def log_summary(self):
+        """Escribe una línea por etapa en el log (con los campos estructurados)."""
+        for row in self.report():
+            parts = [f"{row['calls']} llamadas", f"{row['seconds']:.3f} s"]
+            if "mb_per_s" in row:
+                parts.append(f"{row['mb_per_s']:.1f} MB/s")
+            for key in ("profiles", "blocks", "frames"):
+                if f"{key}_per_s" in row:
+                    parts.append(f"{row[f'{key}_per_s']:.1f} {key}/s")
+            log.info(f"📊 {row['stage']}: " + ", ".join(parts), extra={"fields": row})
+
+    def to_json(self, path):
+        """Guarda summary() en JSON."""
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        log.info(f"💾 Reporte de métricas guardado en {path}")
+
+    def to_csv(self, path):
+        """Guarda report() en CSV (una fila por etapa)."""
+        rows = self.report()
+        columns = ["stage"] + sorted({k for row in rows for k in row} - {"stage"})
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+        log.info(f"💾 Reporte de métricas guardado en {path}")
+
+
+# Instancia compartida por todos los módulos
+metrics = Metrics(enabled=os.environ.get("AMISR14_METRICS", "") not in ("", "0"))
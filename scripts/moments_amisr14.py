@@ -0,0 +1,185 @@
+"""
+Script: moments_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Momentos espectrales por altura para el radar AMISR-14: potencia sin
+    ruido, velocidad Doppler media, ancho espectral y SNR.
+
+    spectral_moments() trabaja sobre espectros de potencia centrados
+    (..., nFFT, nAlturas) -un bloque, una lista apilada o la salida batched
+    de getFFT- y calcula todos los bloques, canales y alturas en una sola
+    pasada vectorizada. El ruido de cada bloque y canal se estima con
+    Hildebrand-Sekhon (noise_amisr14).
+
+    write_moments() recorre una AMISR14Sequence con el pipeline 'getMoments'
+    y guarda una serie temporal compacta en HDF5 (nFFT veces más pequeña
+    que los espectros):
+        utctime    -> (nSalidas,)
+        power      -> (nSalidas, nCanales, nAlturas) potencia sin ruido
+        velocity   -> (nSalidas, nCanales, nAlturas) m/s
+        width      -> (nSalidas, nCanales, nAlturas) m/s
+        snr        -> (nSalidas, nCanales, nAlturas) lineal
+        noise      -> (nSalidas, nCanales) ruido por bin espectral
+        heightList -> (nAlturas,) en km
+
+Uso:
+    python moments_amisr14.py --folder /ruta/datos --output momentos.h5 --ipp 0.005 --freq 440e6
+    python moments_amisr14.py ... --block-size 64 --hop 16 --window hann
+"""
+
+import argparse
+
+import h5py
+import numpy as np
+
+from noise_amisr14 import hildebrand_sekhon
+from metrics_amisr14 import get_logger
+
+log = get_logger("moments_amisr14")
+
+C = 3e8  # velocidad de la luz (m/s)
+
+# Orden de los momentos en el eje -2 de spectral_moments()
+MOMENTS = ("power", "velocity", "width", "snr", "noise")
+
+
+def velocity_axis(nfft, ipp_seconds, radar_freq_hz):
+    """Velocidad Doppler (m/s) de cada bin de un espectro centrado (fftshift)."""
+    freqs = np.fft.fftshift(np.fft.fftfreq(nfft, d=ipp_seconds))  # Hz
+    wavelength = C / radar_freq_hz
+    return (wavelength / 2) * freqs
+
+
+def spectral_moments(spectra, velocity, navg=1):
+    """
+    Momentos de espectros de potencia centrados.
+
+    Parámetros:
+        spectra : ndarray (..., nFFT, nAlturas) potencia lineal
+        velocity : ndarray (nFFT,) eje de velocidad (ver velocity_axis)
+        navg : int -> espectros promediados (para Hildebrand-Sekhon)
+
+    Devuelve:
+        ndarray float32 (..., 5, nAlturas) con los momentos en el orden de
+        MOMENTS; el ruido (uno por bloque y canal) se repite en cada altura.
+    """
+    spectra = np.asarray(spectra)
+    lead = spectra.shape[:-2]
+    nfft, n_heights = spectra.shape[-2:]
+
+    noise = hildebrand_sekhon(spectra.reshape(lead + (-1,)), navg, axis=-1)
+    noise = np.asarray(noise, dtype=np.float32)
+
+    signal = spectra - noise[..., np.newaxis, np.newaxis]
+    np.maximum(signal, 0, out=signal)
+    v = np.asarray(velocity, dtype=np.float32)[:, np.newaxis]
+
+    out = np.empty(lead + (len(MOMENTS), n_heights), dtype=np.float32)
+    p = out[..., 0, :]
+    np.sum(signal, axis=-2, out=p)
+    safe = np.where(p > 0, p, np.inf)
+    vel = out[..., 1, :]
+    np.sum(signal * v, axis=-2, out=vel)
+    vel /= safe
+    width = out[..., 2, :]
+    np.sum(signal * (v - vel[..., np.newaxis, :]) ** 2, axis=-2, out=width)
+    width /= safe
+    np.sqrt(width, out=width)
+    np.divide(p, noise[..., np.newaxis] * nfft, out=out[..., 3, :])
+    out[..., 4, :] = noise[..., np.newaxis]
+    return out
+
+
+def write_moments(seq, output_path, ipp_seconds, radar_freq_hz, block_size=64, nfft=None,
+                  n_incoh=1, hop=None, window=None, workers=None, chunk_outputs=256):
+    """
+    Calcula los momentos de toda la secuencia (pipeline 'getMoments') y los
+    escribe por tramos en output_path, sin guardar los espectros.
+
+    Parámetros:
+        seq : AMISR14Sequence (se recomienda lazy=True)
+        ipp_seconds : float -> IPP crudo (se multiplica por seq.n_coh)
+        radar_freq_hz : float
+        block_size : int -> perfiles por FFT
+        nfft : int -> puntos de la FFT (por defecto block_size)
+        n_incoh : int -> espectros promediados por salida
+        hop : int -> avance entre bloques (por defecto block_size; menor
+              para bloques solapados y mejor resolución temporal)
+        window : str -> ventana antes de la FFT ('hann', 'blackman', ...)
+        chunk_outputs : int -> salidas acumuladas antes de cada escritura
+    """
+    from pipeline_amisr14 import build_operation
+    from process_amisr14_sequence import block_times, integrate_times
+
+    nfft = nfft or block_size
+    n_channels, n_heights = len(seq.channels), len(seq.heightList)
+    pipeline = build_operation(seq, "getMoments", ipp_seconds=ipp_seconds,
+                               radar_freq_hz=radar_freq_hz, nfft=nfft,
+                               n_incoh=n_incoh, workers=workers, window=window)
+    times = integrate_times(block_times(seq.utctime, block_size, hop), n_incoh)
+
+    with h5py.File(output_path, "w") as f:
+        f["heightList"] = np.asarray(seq.heightList) / 1000.0
+        f.attrs["channels"] = seq.channels
+        f.attrs["nfft"] = nfft
+        f.attrs["n_incoh"] = n_incoh
+        f.attrs["hop"] = hop or block_size
+        f.attrs["window"] = window or "rectangular"
+        f.attrs["ipp_seconds"] = ipp_seconds * seq.n_coh
+        f.attrs["radar_freq_hz"] = radar_freq_hz
+        ds_time = f.create_dataset("utctime", shape=(0,), maxshape=(None,), dtype="f8",
+                                   chunks=(chunk_outputs,))
+        ds = {}
+        for name in MOMENTS[:-1]:
+            ds[name] = f.create_dataset(name, shape=(0, n_channels, n_heights),
+                                        maxshape=(None, n_channels, n_heights), dtype="f4",
+                                        chunks=(chunk_outputs, n_channels, n_heights))
+        ds["noise"] = f.create_dataset("noise", shape=(0, n_channels), maxshape=(None, n_channels),
+                                       dtype="f4", chunks=(chunk_outputs, n_channels))
+
+        n = 0
+        pending = []
+
+        def flush():
+            nonlocal n
+            batch = np.stack(pending)  # (m, nCanales, 5, nAlturas)
+            m = len(batch)
+            for ds_k in (ds_time, *ds.values()):
+                ds_k.resize(n + m, axis=0)
+            ds_time[n:n + m] = times[n:n + m]
+            for i, name in enumerate(MOMENTS[:-1]):
+                ds[name][n:n + m] = batch[:, :, i, :]
+            ds["noise"][n:n + m] = batch[:, :, -1, 0]
+            n += m
+            pending.clear()
+
+        for moments in pipeline.run(seq.iter_blocks(block_size, hop=hop)):
+            pending.append(moments)
+            if len(pending) == chunk_outputs:
+                flush()
+        if pending:
+            flush()
+
+    log.info(f"✅ {n} salidas de momentos guardadas en {output_path}")
+    return n
+
+
+if __name__ == "__main__":
+    from process_amisr14_sequence import AMISR14Sequence
+
+    parser = argparse.ArgumentParser(description="Calcula momentos espectrales AMISR-14 a HDF5.")
+    parser.add_argument("--folder", required=True, help="Carpeta con los archivos .hdf5")
+    parser.add_argument("--output", required=True, help="Archivo HDF5 de salida")
+    parser.add_argument("--ipp", type=float, required=True, help="IPP en segundos")
+    parser.add_argument("--freq", type=float, required=True, help="Frecuencia del radar (Hz)")
+    parser.add_argument("--channels", type=int, nargs="+", default=None, help="Canales a procesar")
+    parser.add_argument("--block-size", type=int, default=64, help="Perfiles por FFT")
+    parser.add_argument("--n-incoh", type=int, default=1, help="Espectros integrados por salida")
+    parser.add_argument("--hop", type=int, default=None, help="Avance entre bloques (solapamiento)")
+    parser.add_argument("--window", default=None, help="Ventana: hann, hamming o blackman")
+    args = parser.parse_args()
+
+    seq = AMISR14Sequence(args.folder, channels=args.channels, lazy=True)
+    write_moments(seq, args.output, args.ipp, args.freq,
+                  block_size=args.block_size, n_incoh=args.n_incoh,
+                  hop=args.hop, window=args.window)
@@ -0,0 +1,120 @@
+"""
+Script: noise_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Estimación del piso de ruido para el radar AMISR-14, compartida por la
+    escala de colores de los gráficos y los productos de SNR.
+
+    Dos métodos:
+    - 'histogram': cuantil (por defecto 5 %) de un histograma en dB con bins
+      fijos que se actualiza por bloques. Cada actualización es una sola
+      pasada O(n) (sin ordenar), y el resultado equivale a np.percentile con
+      la resolución del bin.
+    - 'hildebrand': criterio de Hildebrand-Sekhon aplicado a cada bloque de
+      espectro; el ruido es el promedio de los valores por bloque.
+
+Uso:
+    noise = NoiseEstimator()
+    for block in bloques:
+        noise.update(block)                  # potencia lineal
+    vmin, vmax = noise.color_limits(40)
+    snr = noise.snr_db(power)
+"""
+
+import numpy as np
+
+from power_amisr14 import to_db
+
+
+def hildebrand_sekhon(data, navg=1, axis=None):
+    """
+    Nivel de ruido (lineal) de un arreglo de potencias según Hildebrand y
+    Sekhon (1974), vectorizado: se ordenan los datos y se toma el mayor
+    número k de valores bajos cuya varianza cumple var <= media**2 / navg.
+
+    navg es el número de espectros promediados (integración incoherente).
+    Con axis=None se usa todo el arreglo; con axis=k se estima un ruido por
+    cada posición de los demás ejes (p. ej. uno por bloque y canal).
+    """
+    data = np.asarray(data, dtype=np.float64)
+    x = np.sort(data.ravel() if axis is None else np.moveaxis(data, axis, -1), axis=-1)
+    n = x.shape[-1]
+    k = np.arange(1, n + 1)
+    sump = np.cumsum(x, axis=-1)
+    sumq = np.cumsum(x * x, axis=-1)
+
+    # Condición de ruido blanco: k * sum(x^2) <= sum(x)^2 * (1 + 1/navg)
+    bad = k * sumq > sump * sump * (1.0 + 1.0 / navg)
+    nums_min = max(5, int(0.2 * n))
+    bad[..., :nums_min] = False
+    n_noise = np.where(bad.any(axis=-1), np.argmax(bad, axis=-1), n)
+    noise = np.take_along_axis(sump, n_noise[..., np.newaxis] - 1, axis=-1)[..., 0] / n_noise
+    return noise if noise.ndim else float(noise)
+
+
+class NoiseEstimator:
+    """Estimador incremental del piso de ruido."""
+
+    def __init__(self, method="histogram", quantile=5.0,
+                 db_min=-150.0, db_max=150.0, resolution=0.1):
+        """
+        Parámetros:
+            method : 'histogram' o 'hildebrand'
+            quantile : float -> percentil del histograma (0-100)
+            db_min, db_max, resolution : rango y ancho de bin del histograma (dB)
+        """
+        if method not in ("histogram", "hildebrand"):
+            raise ValueError(f"Método '{method}' no reconocido (use 'histogram' o 'hildebrand')")
+        self.method = method
+        self.quantile = quantile
+        self.db_min = db_min
+        self.resolution = resolution
+        self.counts = np.zeros(int(round((db_max - db_min) / resolution)), dtype=np.int64)
+        self.block_noise = []  # ruido lineal por bloque (hildebrand)
+
+    def update(self, power, navg=1):
+        """Agrega un bloque de potencia lineal (cualquier forma)."""
+        if self.method == "hildebrand":
+            self.block_noise.append(hildebrand_sekhon(power, navg))
+            return
+
+        power = np.asarray(power).ravel()
+        self.update_db(to_db(power, out=np.empty(power.shape, dtype=np.float32)))
+
+    def update_db(self, power_db):
+        """Agrega un bloque ya expresado en dB (solo método 'histogram')."""
+        power_db = np.asarray(power_db).ravel()
+        idx = np.subtract(power_db, self.db_min, dtype=np.float32)
+        idx /= self.resolution
+        idx = idx.astype(np.int64)
+        np.clip(idx, 0, len(self.counts) - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+
+    def noise_db(self):
+        """Piso de ruido estimado en dB."""
+        if self.method == "hildebrand":
+            if not self.block_noise:
+                raise ValueError("El estimador de ruido no tiene datos")
+            return 10 * np.log10(np.mean(self.block_noise) + 1e-12)
+
+        total = self.counts.sum()
+        if total == 0:
+            raise ValueError("El estimador de ruido no tiene datos")
+        cdf = np.cumsum(self.counts)
+        i = int(np.searchsorted(cdf, total * self.quantile / 100.0, side="left"))
+        return self.db_min + (i + 0.5) * self.resolution
+
+    def noise(self):
+        """Piso de ruido estimado (potencia lineal)."""
+        return 10 ** (self.noise_db() / 10)
+
+    def color_limits(self, dynamic_range=40):
+        """(vmin, vmax) en dB para la escala de colores."""
+        vmin = self.noise_db()
+        return vmin, vmin + dynamic_range
+
+    def snr_db(self, power):
+        """SNR en dB de una potencia lineal: 10*log10((P - N) / N)."""
+        n = self.noise()
+        snr = (np.asarray(power) - n) / n
+        return 10 * np.log10(np.maximum(snr, 1e-12))
@@ -0,0 +1,385 @@
+"""
+Script: pipeline_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Registro de operaciones y pipeline fusionado para
+    AMISR14Sequence.process_by_blocks.
+
+    Un Pipeline es una cadena de etapas (decodificación -> integración
+    coherente -> espectro -> integración incoherente -> ...) que se aplican
+    una tras otra a cada bloque mientras todavía está en caché, en lugar de
+    recorrer todos los datos una vez por operación. Una etapa puede retener
+    bloques (p. ej. la integración incoherente) y devolver None hasta
+    completar su salida; en ese caso el bloque no sigue a las etapas
+    siguientes.
+
+    Las operaciones con nombre ('getFFT', 'getSpectra', ...) son fábricas de
+    pipelines registradas con @register_operation: para agregar una operación
+    nueva basta con registrarla, sin modificar AMISR14Sequence.
+
+Uso:
+    pipe = Pipeline(Decode(barker_code(13)), Coherent(4), Spectrum(nfft=64), Incoherent(8))
+    spectra = seq.process_by_blocks(pipe, block_size=256)
+
+    # Bloques solapados al 75 % con ventana de Hann
+    spectra = seq.process_by_blocks("getSpectra", 64, hop=16, window="hann", n_incoh=4)
+
+    @register_operation("getPeak")
+    def _peak(seq, nfft=64):
+        return Pipeline(Spectrum(nfft), MiEtapa())
+"""
+
+import itertools
+
+import numpy as np
+
+try:
+    import scipy.fft as scipy_fft  # FFT multihilo opcional
+except ImportError:
+    scipy_fft = None
+
+from decode_amisr14 import Decoder
+from moments_amisr14 import spectral_moments, velocity_axis
+from power_amisr14 import power
+from metrics_amisr14 import get_logger, metrics
+
+log = get_logger("pipeline_amisr14")
+
+
+def coherent_integration(data, n_coh, out=None):
+    """
+    Integración coherente: suma n_coh perfiles complejos consecutivos.
+
+    data (nCanales, nPerfiles, nAlturas) -> (nCanales, nPerfiles // n_coh, nAlturas).
+    Los perfiles sobrantes al final (menos de n_coh) se descartan.
+    """
+    n_channels, n_profiles, n_heights = data.shape
+    m = n_profiles // n_coh
+    grouped = data[:, :m * n_coh, :].reshape(n_channels, m, n_coh, n_heights)
+    return np.sum(grouped, axis=2, out=out)
+
+
+# Ventanas de taper disponibles por nombre (versión periódica)
+WINDOWS = {
+    "hann": np.hanning,
+    "hamming": np.hamming,
+    "blackman": np.blackman,
+}
+
+
+def get_window(window, n):
+    """
+    Ventana de n muestras para aplicar antes de la FFT.
+
+    window puede ser None (rectangular), un nombre de WINDOWS o un arreglo
+    de n valores. Se normaliza a potencia media 1 (mean(w**2) == 1), de modo
+    que el piso de ruido del espectro no cambia con la ventana.
+    """
+    if window is None:
+        return None
+    if isinstance(window, str):
+        if window not in WINDOWS:
+            raise ValueError(f"Ventana '{window}' no reconocida (disponibles: {sorted(WINDOWS)})")
+        w = WINDOWS[window](n + 1)[:-1]
+    else:
+        w = np.asarray(window, dtype=np.float64)
+        if w.shape != (n,):
+            raise ValueError(f"La ventana tiene {w.size} muestras y el bloque {n} perfiles")
+    return (w / np.sqrt(np.mean(w ** 2))).astype(np.float32)
+
+
+def _fft(x, n, axis, workers=None):
+    """FFT con scipy.fft (multihilo) si se piden workers, o con numpy."""
+    with metrics.stage("fft") as st:
+        st.add(bytes=x.nbytes)
+        if workers is not None and scipy_fft is not None:
+            return scipy_fft.fft(x, n=n, axis=axis, workers=workers)
+        return np.fft.fft(x, n=n, axis=axis)
+
+
+# -------------------------------------------------------------
+# 🔹 Etapas
+# -------------------------------------------------------------
+
+class Stage:
+    """
+    Etapa base. __call__(x) recibe un bloque (nCanales, nPerfiles, nAlturas)
+    o la salida de la etapa anterior y devuelve un arreglo nuevo, o None si
+    todavía no hay salida. Los atributos públicos son los parámetros de la
+    etapa (forman parte de la clave de caché); el estado va en atributos
+    con guion bajo.
+    """
+    name = "stage"
+
+    def reset(self):
+        """Reinicia el estado antes de recorrer una secuencia."""
+
+    def finish(self):
+        """Se llama al terminar la secuencia (p. ej. para avisar de restos)."""
+
+    def config(self):
+        return {k: v for k, v in vars(self).items() if not k.startswith("_")}
+
+
+class Decode(Stage):
+    """
+    Decodificación por filtro adaptado (ver decode_amisr14.Decoder). Cuenta
+    los perfiles recibidos para alternar los códigos, por lo que con bloques
+    solapados (hop) se debe decodificar en la secuencia (code=...).
+    """
+    name = "decode"
+
+    def __init__(self, code, samples_per_baud=1, workers=None):
+        self.code = np.asarray(code).tolist()
+        self.samples_per_baud = samples_per_baud
+        self._decoder = Decoder(code, samples_per_baud, workers)
+        self._profile = 0
+
+    def reset(self):
+        self._profile = 0
+
+    def __call__(self, x):
+        out = self._decoder(x, self._profile)
+        self._profile += x.shape[1]
+        return out
+
+
+class Coherent(Stage):
+    """Integración coherente de n_coh perfiles (block_size debe ser múltiplo)."""
+    name = "coherent"
+
+    def __init__(self, n_coh):
+        self.n_coh = n_coh
+
+    def __call__(self, x):
+        return coherent_integration(x, self.n_coh)
+
+
+class _Tapered(Stage):
+    """Base de las etapas FFT: aplica la ventana (si hay) sobre el eje de perfiles."""
+
+    def _set_window(self, window):
+        self.window = window if window is None or isinstance(window, str) else np.asarray(window).tolist()
+        self._tapers = {}
+
+    def _taper(self, x):
+        if self.window is None:
+            return x
+        n = x.shape[1]
+        if n not in self._tapers:
+            self._tapers[n] = get_window(self.window, n)
+        return x * self._tapers[n][:, np.newaxis]
+
+
+class Spectrum(_Tapered):
+    """
+    Espectro de potencia |FFT|^2 sobre el eje de perfiles (nCanales, nFFT, nAlturas).
+    window: None, 'hann', 'hamming', 'blackman' o arreglo (ver get_window).
+    """
+    name = "spectrum"
+
+    def __init__(self, nfft=64, workers=None, shift=True, window=None):
+        self.nfft = nfft
+        self.shift = shift
+        self._workers = workers
+        self._set_window(window)
+
+    def __call__(self, x):
+        spectrum = power(_fft(self._taper(x), self.nfft, 1, self._workers))
+        return np.fft.fftshift(spectrum, axes=1) if self.shift else spectrum
+
+
+class CrossSpectrum(_Tapered):
+    """
+    Espectros cruzados X_a * conj(X_b) para pares de índices de canal
+    (nPares, nFFT, nAlturas). La FFT se calcula una vez para todos los canales.
+    """
+    name = "cross_spectrum"
+
+    def __init__(self, idx_a, idx_b, nfft=64, workers=None, shift=True, window=None):
+        self.idx_a = list(idx_a)
+        self.idx_b = list(idx_b)
+        self.nfft = nfft
+        self.shift = shift
+        self._workers = workers
+        self._set_window(window)
+
+    def __call__(self, x):
+        fft_res = _fft(self._taper(x), self.nfft, 1, self._workers)
+        cross = fft_res[self.idx_b]
+        np.conjugate(cross, out=cross)
+        cross *= fft_res[self.idx_a]
+        return np.fft.fftshift(cross, axes=1) if self.shift else cross
+
+
+class Incoherent(Stage):
+    """
+    Integración incoherente: promedia n_incoh entradas consecutivas en un
+    único acumulador y devuelve None hasta completar cada promedio.
+    """
+    name = "incoherent"
+
+    def __init__(self, n_incoh):
+        self.n_incoh = n_incoh
+        self._acc = None
+        self._count = 0
+
+    def reset(self):
+        self._acc = None
+        self._count = 0
+
+    def __call__(self, x):
+        if self._acc is None:
+            self._acc = np.zeros_like(x)
+        self._acc += x
+        self._count += 1
+        if self._count < self.n_incoh:
+            return None
+        out = self._acc / self.n_incoh
+        self._acc[...] = 0
+        self._count = 0
+        return out
+
+    def finish(self):
+        if self._count:
+            log.warning(f"⚠️ Integración incompleta al final ({self._count}/{self.n_incoh} bloques), omitida.")
+
+
+class FFTShift(Stage):
+    """Centra la frecuencia cero (se aplica una vez por salida integrada)."""
+    name = "fftshift"
+
+    def __init__(self, axis=1):
+        self.axis = axis
+
+    def __call__(self, x):
+        return np.fft.fftshift(x, axes=self.axis)
+
+
+class PowerProfile(Stage):
+    """Potencia media por altura del bloque (nCanales, nAlturas)."""
+    name = "power_profile"
+
+    def __call__(self, x):
+        return np.mean(power(x), axis=1)
+
+
+class Moments(Stage):
+    """
+    Momentos de espectros centrados (nCanales, nFFT, nAlturas) ->
+    (nCanales, 5, nAlturas); ver moments_amisr14.spectral_moments.
+    """
+    name = "moments"
+
+    def __init__(self, velocity, navg=1):
+        self.velocity = np.asarray(velocity).tolist()
+        self.navg = navg
+        self._velocity = np.asarray(velocity, dtype=np.float32)
+
+    def __call__(self, x):
+        return spectral_moments(x, self._velocity, self.navg)
+
+
+class Pipeline:
+    """Cadena de etapas aplicada bloque a bloque."""
+
+    def __init__(self, *stages):
+        self.stages = list(stages)
+
+    def config(self):
+        """Descripción serializable (para la clave de caché)."""
+        return [(type(s).__name__, s.config()) for s in self.stages]
+
+    def run(self, blocks):
+        """Genera las salidas de aplicar todas las etapas a cada bloque."""
+        for stage in self.stages:
+            stage.reset()
+        for x in blocks:
+            for stage in self.stages:
+                with metrics.stage(stage.name) as st:
+                    x = stage(x)
+                    st.add(blocks=1)
+                if x is None:
+                    break
+            else:
+                yield x
+        for stage in self.stages:
+            stage.finish()
+
+
+# -------------------------------------------------------------
+# 🔹 Registro de operaciones
+# -------------------------------------------------------------
+
+OPERATIONS = {}
+
+
+def register_operation(name):
+    """
+    Decorador que registra una fábrica de pipelines bajo un nombre.
+    La fábrica recibe la secuencia y los kwargs de process_by_blocks.
+    """
+    def decorator(factory):
+        OPERATIONS[name] = factory
+        return factory
+    return decorator
+
+
+def build_operation(seq, operation, **kwargs):
+    """Devuelve el Pipeline de una operación registrada (o el Pipeline dado)."""
+    if isinstance(operation, Pipeline):
+        if kwargs:
+            raise ValueError("Los parámetros de un Pipeline se dan en sus etapas, no en kwargs")
+        return operation
+    if operation not in OPERATIONS:
+        raise ValueError(f"Operación '{operation}' no reconocida (registradas: {sorted(OPERATIONS)})")
+    return OPERATIONS[operation](seq, **kwargs)
+
+
+@register_operation("getFFT")
+def _fft_operation(seq, nfft=64, workers=None, window=None):
+    return Pipeline(Spectrum(nfft, workers, window=window))
+
+
+@register_operation("getPower")
+def _power_operation(seq):
+    return Pipeline(PowerProfile())
+
+
+@register_operation("getCoherent")
+def _coherent_operation(seq, n_coh):
+    return Pipeline(Coherent(n_coh))
+
+
+@register_operation("getSpectra")
+def _spectra_operation(seq, nfft=64, n_incoh=1, workers=None, window=None):
+    # Se acumula sin fftshift intermedio; el desplazamiento se aplica una
+    # vez por espectro integrado (block_size * n_incoh perfiles). Con bloques
+    # solapados (hop) y ventana equivale al método de Welch.
+    return Pipeline(Spectrum(nfft, workers, shift=False, window=window),
+                    Incoherent(n_incoh), FFTShift())
+
+
+@register_operation("getCrossSpectra")
+def _cross_spectra_operation(seq, pairs=None, nfft=64, n_incoh=1, workers=None, window=None):
+    # pairs: pares de números de canal, p. ej. [(0, 1), (0, 4)]; por defecto
+    # todas las combinaciones de seq.channels.
+    if pairs is None:
+        pairs = list(itertools.combinations(seq.channels, 2))
+    missing = [ch for pair in pairs for ch in pair if ch not in seq.channels]
+    if missing:
+        raise ValueError(f"Canales {sorted(set(missing))} no leídos (canales: {seq.channels})")
+    idx_a = [seq.channels.index(a) for a, _ in pairs]
+    idx_b = [seq.channels.index(b) for _, b in pairs]
+    return Pipeline(CrossSpectrum(idx_a, idx_b, nfft, workers, shift=False, window=window),
+                    Incoherent(n_incoh), FFTShift())
+
+
+@register_operation("getMoments")
+def _moments_operation(seq, ipp_seconds, radar_freq_hz, nfft=64, n_incoh=1, workers=None,
+                       window=None):
+    # Potencia sin ruido, velocidad, ancho y SNR por altura en lugar del
+    # espectro completo; el IPP efectivo incluye la integración coherente.
+    velocity = velocity_axis(nfft, ipp_seconds * seq.n_coh, radar_freq_hz)
+    return Pipeline(Spectrum(nfft, workers, shift=False, window=window), Incoherent(n_incoh),
+                    FFTShift(), Moments(velocity, navg=n_incoh))
@@ -9,10 +9,13 @@ Descripción:
 import numpy as np
 import matplotlib.pyplot as plt
 
+from noise_amisr14 import NoiseEstimator
+from power_amisr14 import to_db
+
 C = 3e8  # velocidad de la luz (m/s)
 
 def plot_spectrum_block(power_spectrum, heights, ipp_seconds, radar_freq_hz,
-                        block_index=0, cmap="jet", xunits="m/s"):
+                        block_index=0, cmap="jet", xunits="m/s", n_coh=1):
     """
     Grafica el espectro de potencia de un bloque FFT del radar AMISR-14.
 
@@ -22,7 +25,7 @@ def plot_spectrum_block(power_spectrum, heights, ipp_seconds, radar_freq_hz,
         heights : np.ndarray
             Alturas (km)
         ipp_seconds : float
-            Intervalo entre perfiles (segundos)
+            Intervalo entre perfiles crudos (segundos)
         radar_freq_hz : float
             Frecuencia de transmisión (Hz)
         block_index : int
@@ -31,14 +34,17 @@ def plot_spectrum_block(power_spectrum, heights, ipp_seconds, radar_freq_hz,
             Paleta de colores
         xunits : str
             'hz' o 'm/s'
+        n_coh : int
+            Factor de integración coherente aplicado antes de la FFT
+            (el IPP efectivo es ipp_seconds * n_coh)
     """
 
     # Canal 0 por defecto
-    data_db = 10 * np.log10(power_spectrum[0] + 1e-12)
+    data_db = to_db(power_spectrum[0])
     nfft, nalt = data_db.shape
 
     # Eje de frecuencias Doppler
-    freqs = np.fft.fftshift(np.fft.fftfreq(nfft, d=ipp_seconds))  # Hz
+    freqs = np.fft.fftshift(np.fft.fftfreq(nfft, d=ipp_seconds * n_coh))  # Hz
 
     if xunits.lower() == "m/s":
         wavelength = C / radar_freq_hz
@@ -47,9 +53,10 @@ def plot_spectrum_block(power_spectrum, heights, ipp_seconds, radar_freq_hz,
     else:
         xlabel = "Frecuencia Doppler (Hz)"
 
-    # Escala de colores
-    vmin = np.percentile(data_db, 5)
-    vmax = vmin + 40
+    # Escala de colores (piso de ruido del bloque)
+    noise = NoiseEstimator()
+    noise.update_db(data_db)
+    vmin, vmax = noise.color_limits(40)
 
     plt.figure(figsize=(10, 6))
     plt.pcolormesh(freqs, heights, data_db.T, shading="auto", cmap=cmap, vmin=vmin, vmax=vmax)
@@ -0,0 +1,60 @@
+"""
+Script: power_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Conversión de voltajes complejos a potencia y a dB para el radar AMISR-14,
+    sin arreglos temporales del tamaño de la entrada.
+
+    power() calcula |x|^2 como np.absolute() seguido de un cuadrado en el
+    mismo buffer, y to_db() aplica 10*log10(p + piso) en el lugar. Ambas
+    conservan la precisión de la entrada (complex64 -> float32) y aceptan
+    out= para reutilizar un buffer entre bloques.
+
+Uso:
+    p = power(block)                  # float32 si block es complex64
+    to_db(p, out=p)                   # en el lugar
+"""
+
+import numpy as np
+
+from metrics_amisr14 import metrics
+
+# Precisión por defecto de los voltajes (y float32 para las potencias)
+DTYPE = np.complex64
+
+DB_FLOOR = 1e-12  # evita log10(0)
+
+
+def real_dtype(dtype):
+    """Tipo real con la misma precisión: complex64 -> float32, complex128 -> float64."""
+    return np.finfo(np.dtype(dtype)).dtype
+
+
+def power(x, out=None):
+    """|x|^2 en la precisión de x. Con out= no se crea ningún arreglo nuevo."""
+    x = np.asarray(x)
+    if out is None:
+        out = np.empty(x.shape, dtype=real_dtype(x.dtype))
+    with metrics.stage("power") as st:
+        st.add(bytes=x.nbytes)
+        np.absolute(x, out=out)
+        return np.multiply(out, out, out=out)
+
+
+def to_db(p, out=None, floor=DB_FLOOR):
+    """10*log10(p + floor). Con out=p la conversión es en el lugar."""
+    p = np.asarray(p)
+    with metrics.stage("to_db") as st:
+        st.add(bytes=p.nbytes)
+        out = np.add(p, floor, out=out, dtype=real_dtype(p.dtype) if out is None else None)
+        np.log10(out, out=out)
+        return np.multiply(out, 10, out=out)
+
+
+def power_db(x, out=None, floor=DB_FLOOR):
+    """Potencia en dB de voltajes complejos (o de una potencia real) en un solo buffer."""
+    x = np.asarray(x)
+    if np.iscomplexobj(x):
+        p = power(x, out=out)
+        return to_db(p, out=p, floor=floor)
+    return to_db(x, out=out, floor=floor)
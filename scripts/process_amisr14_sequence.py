@@ -10,99 +10,681 @@ Requiere: read_amisr14_class.py (de la versión anterior)
 """
 
 import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import h5py
 import numpy as np
-from read_amisr14_class import read_amisr14_file, DataOut
+from numpy.lib.stride_tricks import sliding_window_view
+from read_amisr14_class import (read_amisr14_file, resolve_channels, profile_range,
+                                height_range, read_heights, to_datetime64, local_labels,
+                                DataOut, channel_reader, open_file)
+from power_amisr14 import DTYPE, power, real_dtype
+from decode_amisr14 import Decoder
+from catalog_amisr14 import FileCatalog
+from cache_amisr14 import ResultCache
+from pipeline_amisr14 import Spectrum, build_operation, coherent_integration, get_window, _fft
+from metrics_amisr14 import get_logger, metrics
+
+log = get_logger("process_amisr14_sequence")
+
+BATCH_BYTES = 2 * 2**20  # tamaño de cada lote de la FFT batched (espectros complejos)
 
 
 class AMISR14Sequence:
     """Maneja una secuencia de archivos AMISR-14 de manera ordenada y continua."""
 
-    def __init__(self, folder_path):
+    def __init__(self, folder_path, channels=None, lazy=False, workers=1, n_coh=1,
+                 code=None, samples_per_baud=1, use_catalog=False,
+                 t_start=None, t_end=None, h_min=None, h_max=None, cache=None,
+                 pattern="*.hdf5", dtype=DTYPE):
+        """
+        Parámetros:
+            folder_path: str -> carpeta con los archivos HDF5, o la ruta de un
+                         único archivo (p. ej. un archivo reempaquetado con
+                         archive_amisr14.py); ambos formatos se leen igual
+            channels: list[int] -> canales a leer (por defecto solo el primer
+                      canal del primer archivo, channel00)
+            lazy: bool -> si es True no carga los datos en memoria; solo lee
+                  utctime y heightList, y los bloques se leen bajo demanda
+                  con iter_blocks()
+            workers: int -> número de hilos para leer archivos en paralelo
+            n_coh: int -> integración coherente: suma n_coh perfiles complejos
+                   consecutivos al leer (el IPP efectivo es ipp * n_coh)
+            code: array (nCodigos, nBaudios) -> código de transmisión (Barker o
+                  complementario, ver decode_amisr14.py). Si se indica, los
+                  perfiles se decodifican al leer, antes de la integración
+                  coherente, y heightList se recorta en consecuencia
+            samples_per_baud: int -> muestras de altura por baudio del código
+            use_catalog: bool -> usa (y actualiza) el catálogo SQLite de la
+                         carpeta (ver catalog_amisr14.py) para obtener la
+                         lista de archivos y sus formas sin abrirlos; con
+                         lazy=True utctime se lee recién cuando se usa
+            t_start, t_end: float -> ventana de tiempo (segundos UTC); solo se
+                            leen los perfiles (y archivos) dentro de ella
+            h_min, h_max: float -> rango de alturas en km; solo se leen esas
+                          alturas de cada dataset
+            cache: str o ResultCache -> caché en disco de los resultados de
+                   process_by_blocks (ver cache_amisr14.py)
+            pattern: str -> patrón de los archivos dentro de la carpeta
+            dtype: tipo numpy -> precisión de los voltajes en memoria
+                   (complex64 por defecto; las potencias salen en float32)
+        """
+        if os.path.isfile(folder_path):
+            folder_path, pattern = os.path.split(os.path.abspath(folder_path))
         self.folder_path = folder_path
-        self.files = sorted(glob.glob(f"{folder_path}/*.hdf5"))
+        self.pattern = pattern
+        self.lazy = lazy
+        self.workers = workers
+        self.n_coh = n_coh
+        self.decoder = Decoder(code, samples_per_baud) if code is not None else None
+        self.load_stats = {}
+        self.cache = ResultCache(cache) if isinstance(cache, str) else cache
+        self.t_start, self.t_end = t_start, t_end
+        self.h_min, self.h_max = h_min, h_max
+        self.catalog = None
+        self._entries = None
+        if use_catalog:
+            self.catalog = FileCatalog(folder_path, pattern=pattern)
+            self.catalog.update()
+            self._entries = self.catalog.entries(t_start, t_end)
+            self.files = [e["path"] for e in self._entries]
+            if len({e["height_hash"] for e in self._entries}) > 1:
+                log.warning("⚠️ Advertencia: los archivos no comparten la misma heightList.")
+        else:
+            self.files = sorted(glob.glob(os.path.join(folder_path, pattern)))
         if not self.files:
             raise FileNotFoundError(f"No se encontraron archivos HDF5 en {folder_path}")
+        with h5py.File(self.files[0], "r") as f:
+            self.channels = resolve_channels(f, channels)
+        self._dtype = np.dtype(dtype)
         self.dataOutList = []
         self.data = None
+        self._times_pending = False
         self.utctime = None
         self.heightList = None
-        self._load_all()
+        self._select()
+        if lazy and self._entries is not None:
+            self._index_from_catalog()
+        elif lazy:
+            self._scan_all()
+        elif n_coh > 1 or self.decoder is not None:
+            self._scan_all()
+            self._load_streamed()
+        else:
+            self._load_all()
+        if self.decoder is not None:
+            self.heightList = self.decoder.trim_heights(self.heightList)
+        if n_coh > 1:
+            if not self._times_pending:
+                self.utctime = integrate_times(self.utctime, n_coh)
+            log.info(f"✅ Integración coherente x{n_coh}: {self.n_profiles} perfiles")
 
     def _load_all(self):
-        """Carga todos los archivos secuencialmente."""
-        print(f"📂 Cargando {len(self.files)} archivos desde {self.folder_path}")
-        all_data = []
-        all_utctime = []
+        """
+        Carga todos los archivos secuencialmente.
+
+        Primero se leen las formas de cada archivo para reservar un único
+        buffer (canales, perfiles_total, alturas); luego cada archivo se lee
+        directamente en su porción del buffer. Con workers > 1 los archivos
+        se leen en paralelo, pero cada uno ocupa siempre su posición temporal.
+        """
+        log.info(f"📂 Cargando {len(self.files)} archivos desde {self.folder_path}")
+        shapes = [(p1 - p0, self._heights[1] - self._heights[0]) for p0, p1 in self._profiles]
+        n_total = sum(s[0] for s in shapes)
+        n_heights = shapes[0][1]
+        self.data = np.empty((len(self.channels), n_total, n_heights), dtype=self._dtype)  # (canales, perfiles_total, alturas)
 
-        for file in self.files:
-            d = read_amisr14_file(file)
-            self.dataOutList.append(d)
-            all_data.append(d.data)
-            all_utctime.append(d.utctime)
+        starts = np.concatenate([[0], np.cumsum([s[0] for s in shapes])[:-1]])
+
+        t0 = time.perf_counter()
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                self.dataOutList = list(pool.map(self._read_file, self.files, starts, shapes))
+        else:
+            self.dataOutList = [self._read_file(f, st, sh) for f, st, sh in zip(self.files, starts, shapes)]
+        elapsed = time.perf_counter() - t0
+        all_utctime = [d.utctime for d in self.dataOutList]
+
+        self.load_stats = {
+            "files": len(self.files),
+            "workers": self.workers,
+            "bytes": self.data.nbytes,
+            "seconds": elapsed,
+            "mb_per_s": self.data.nbytes / 1e6 / elapsed if elapsed > 0 else float("inf"),
+        }
+        metrics.record("load_sequence", elapsed, bytes=self.data.nbytes, profiles=n_total)
+        log.info(f"⏱️ Lectura: {self.data.nbytes / 1e6:.1f} MB en {elapsed:.2f} s "
+                 f"({self.load_stats['mb_per_s']:.1f} MB/s, {self.workers} hilo(s))",
+                 extra={"fields": self.load_stats})
 
         # Concatenar en orden temporal
-        self.data = np.concatenate([d for d in all_data], axis=1)  # (canales, perfiles_total, alturas)
-        self.utctime = np.concatenate([u for u in all_utctime])
-        self.heightList = self.dataOutList[0].heightList
+        self.utctime = np.concatenate(all_utctime)
+        self._check_time_gaps()
 
-        # Asegurar que los archivos sean consecutivos en tiempo
-        diffs = np.diff(self.utctime)
-        if np.max(diffs) > 10:  # umbral arbitrario de 10 seg entre archivos
-            print("⚠️ Advertencia: se detectaron saltos de tiempo entre archivos no consecutivos.")
+        log.info(f"✅ Datos concatenados: {self.data.shape}")
 
-        print(f"✅ Datos concatenados: {self.data.shape}")
+    def _select(self):
+        """
+        Resuelve la ventana de tiempo y el rango de alturas: self._profiles
+        guarda el rango [p0, p1) de perfiles a leer de cada archivo y
+        self._heights el rango [h0, h1) de alturas. Los archivos fuera de la
+        ventana se descartan. Si el catálogo indica que un archivo cae entero
+        dentro de la ventana, no se abre.
+        """
+        with h5py.File(self.files[0], "r") as f:
+            heightList = read_heights(f)
+        self._heights = height_range(heightList, self.h_min, self.h_max)
+        self.heightList = heightList[self._heights[0]:self._heights[1]]
+
+        files, profiles = [], []
+        for i, file in enumerate(self.files):
+            entry = self._entries[i] if self._entries is not None else None
+            inside = (entry is not None
+                      and (self.t_start is None or entry["t_first"] >= self.t_start)
+                      and (self.t_end is None or entry["t_last"] <= self.t_end))
+            if inside:
+                p0, p1 = 0, entry["n_profiles"]
+            else:
+                with h5py.File(file, "r") as f:
+                    p0, p1 = profile_range(f["Data/utctime"][:], self.t_start, self.t_end)
+            if p1 > p0:
+                files.append(file)
+                profiles.append((p0, p1))
+
+        if not files or self._heights[1] == self._heights[0]:
+            raise ValueError("No hay perfiles dentro de la ventana de tiempo/alturas solicitada")
+        self.files = files
+        self._profiles = profiles
+
+    def _read_file(self, file, start, shape):
+        """Lee un archivo en su porción [start, start + nPerfiles) de self.data."""
+        n_profiles = shape[0]
+        return read_amisr14_file(file, channels=self.channels,
+                                 out=self.data[:, start:start + n_profiles, :],
+                                 use_mmap=self.workers > 1,
+                                 t_start=self.t_start, t_end=self.t_end,
+                                 h_min=self.h_min, h_max=self.h_max)
+
+    def _load_streamed(self):
+        """
+        Carga la secuencia decodificando e integrando coherentemente mientras
+        se lee, de modo que nunca se reserva el arreglo completo de perfiles
+        crudos.
+        """
+        n_out = self.n_profiles // self.n_coh
+        chunk = 1024 * self.n_coh  # perfiles crudos por lectura
+        start = 0
+        first_profile = 0
+        for raw in self._iter_file_blocks(chunk, partial=True):
+            block = self._prepare_block(raw, first_profile)
+            first_profile += raw.shape[1]
+            m = block.shape[1]
+            if self.data is None:
+                self.data = np.empty((block.shape[0], n_out, block.shape[2]), dtype=block.dtype)
+            self.data[:, start:start + m, :] = block
+            start += m
+
+        log.info(f"✅ Datos procesados: {self.data.shape}")
+
+    def _prepare_block(self, raw, first_profile):
+        """Decodifica (si hay código) e integra coherentemente un bloque crudo."""
+        if self.decoder is not None:
+            with metrics.stage("decode") as st:
+                raw = self.decoder(raw, first_profile)
+                st.add(profiles=raw.shape[1])
+        if self.n_coh > 1:
+            with metrics.stage("coherent") as st:
+                st.add(profiles=raw.shape[1])
+                raw = coherent_integration(raw, self.n_coh)
+        return raw
+
+    def _scan_all(self):
+        """Lee solo los tiempos y alturas de cada archivo."""
+        log.info(f"📂 Indexando {len(self.files)} archivos desde {self.folder_path}")
+        all_utctime = []
+
+        for file, (p0, p1) in zip(self.files, self._profiles):
+            with h5py.File(file, "r") as f:
+                all_utctime.append(f["Data/utctime"][p0:p1])
+
+        self.utctime = np.concatenate(all_utctime)
+        self._check_time_gaps()
+
+        log.info(f"✅ Perfiles disponibles: {len(self.utctime)}")
+
+    def _index_from_catalog(self):
+        """
+        Modo lazy con catálogo: el número de perfiles y los saltos entre
+        archivos salen del catálogo, sin abrir los archivos. utctime se lee
+        (con _scan_all) la primera vez que se usa.
+        """
+        entries = {e["path"]: e for e in self._entries}
+        firsts = np.array([entries[os.path.abspath(p)]["t_first"] for p in self.files])
+        lasts = np.array([entries[os.path.abspath(p)]["t_last"] for p in self.files])
+        if np.any(firsts[1:] - lasts[:-1] > 10):  # mismo umbral que _check_time_gaps
+            log.warning("⚠️ Advertencia: se detectaron saltos de tiempo entre archivos no consecutivos.")
+        self._times_pending = True
+        log.info(f"📇 Perfiles disponibles (catálogo): {self.n_profiles}")
+
+    @property
+    def utctime(self):
+        """
+        Tiempos UTC de los perfiles (integrados si n_coh > 1). En modo lazy
+        con catálogo se leen e integran al pedirlos.
+        """
+        if self._times_pending:
+            self._times_pending = False
+            self._scan_all()
+            if self.n_coh > 1:
+                self._utctime = integrate_times(self._utctime, self.n_coh)
+        return self._utctime
+
+    @utctime.setter
+    def utctime(self, value):
+        self._utctime = value
+
+    @property
+    def n_profiles(self):
+        """Número de perfiles (integrados) de la secuencia, sin leer utctime."""
+        if self._times_pending:
+            return sum(p1 - p0 for p0, p1 in self._profiles) // self.n_coh
+        return len(self.utctime)
+
+    @property
+    def times(self):
+        """utctime como ndarray datetime64[us] (UTC)."""
+        return to_datetime64(self.utctime)
+
+    def time_labels(self, start=0, stop=None):
+        """Etiquetas de hora local (Lima) de los perfiles [start:stop], bajo demanda."""
+        return local_labels(self.times[start:stop])
+
+    def _check_time_gaps(self):
+        """Asegura que los archivos sean consecutivos en tiempo."""
+        diffs = np.diff(self.utctime)
+        if diffs.size and np.max(diffs) > 10:  # umbral arbitrario de 10 seg entre archivos
+            log.warning("⚠️ Advertencia: se detectaron saltos de tiempo entre archivos no consecutivos.")
 
     # -------------------------------------------------------------
     # 🔹 Operaciones por bloques
     # -------------------------------------------------------------
 
-    def process_by_blocks(self, operation, block_size, **kwargs):
+    def process_by_blocks(self, operation, block_size, batched=False, hop=None, **kwargs):
         """
         Aplica una operación a bloques de perfiles.
 
         Parámetros:
-            operation: str -> 'getFFT', 'getPower', etc.
+            operation: str o Pipeline -> nombre de una operación registrada
+                       ('getFFT', 'getSpectra', 'getCrossSpectra', 'getPower',
+                       'getCoherent', 'getMoments', ... ver pipeline_amisr14.OPERATIONS) o un
+                       Pipeline de etapas que se aplican fusionadas a cada bloque
             block_size: int -> número de perfiles por bloque
-            kwargs -> parámetros adicionales de cada operación
+            batched: bool -> (solo 'getFFT') calcula todas las FFT en una sola
+                     llamada y devuelve un ndarray (nBloques, nCanales, nFFT, nAlturas)
+            hop: int -> avance entre bloques (por defecto block_size, bloques
+                 disjuntos); hop < block_size da bloques solapados, p. ej.
+                 hop=block_size // 4 para un 75 % de solapamiento
+            kwargs -> parámetros adicionales de cada operación (las operaciones
+                      FFT aceptan window='hann', 'hamming', 'blackman', ...)
 
         Devuelve:
-            Lista de resultados de cada bloque
-        """
-        n_profiles = self.data.shape[1]
-        print(f"\n⚙️ Ejecutando operación '{operation}' en bloques de {block_size} perfiles...")
-        results = []
-
-        i = 0
-        while i < n_profiles:
-            end = i + block_size
-            if end > n_profiles:
-                # si el bloque excede, ya no hay más archivos disponibles
-                # simplemente rompe (también se podría implementar relleno)
-                end = n_profiles
-
-            block = self.data[:, i:end, :]
-            if block.shape[1] < block_size:
-                print("⚠️ Bloque incompleto al final, omitido.")
-                break
-
-            if operation == "getFFT":
-                res = self._compute_fft(block, **kwargs)
-            elif operation == "getPower":
-                res = np.mean(np.abs(block) ** 2, axis=1)
-            else:
-                raise ValueError(f"Operación '{operation}' no reconocida")
+            Lista de resultados de cada bloque (o un ndarray si batched=True)
 
-            results.append(res)
-            i += block_size
+        Si la secuencia tiene caché, un resultado ya calculado con los mismos
+        archivos y parámetros se lee del disco en lugar de recalcularse.
+        """
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(operation, block_size, batched, hop, kwargs)
+            results = self.cache.load(key)
+            if results is not None:
+                return results
 
-        print(f"✅ {len(results)} bloques procesados.")
+        with metrics.stage(operation if isinstance(operation, str) else "pipeline") as st:
+            results = self._run_operation(operation, block_size, batched, hop, **kwargs)
+            st.add(blocks=len(results))
+        if key is not None:
+            self.cache.store(key, results)
+        return results
+
+    def _cache_key(self, operation, block_size, batched, hop, kwargs):
+        """Clave de caché: archivos de entrada + lectura + operación y parámetros."""
+        config = {
+            "operation": operation if isinstance(operation, str) else operation.config(),
+            "block_size": block_size,
+            "batched": batched,
+            "hop": hop if hop != block_size else None,
+            "kwargs": {k: (v.tolist() if isinstance(v, np.ndarray) else v)
+                       for k, v in kwargs.items() if k != "workers"},
+            "channels": self.channels,
+            "n_coh": self.n_coh,
+            "code": self.decoder.code.tolist() if self.decoder is not None else None,
+            "profiles": self._profiles,
+            "heights": self._heights,
+            "dtype": str(self._dtype),
+        }
+        return ResultCache.make_key(self.files, config)
+
+    def _run_operation(self, operation, block_size, batched=False, hop=None, **kwargs):
+        """
+        Ejecuta la operación pedida sobre los bloques (sin caché). Las
+        operaciones con nombre se buscan en el registro de pipeline_amisr14;
+        todas las etapas se aplican a cada bloque antes de leer el siguiente.
+        """
+        name = operation if isinstance(operation, str) else "pipeline"
+        log.info(f"⚙️ Ejecutando operación '{name}' en bloques de {block_size} perfiles...")
+        if batched:
+            if operation != "getFFT":
+                raise ValueError(f"Modo batched no disponible para '{name}'")
+            results = self._compute_fft_batched(block_size, hop=hop, **kwargs)
+        else:
+            pipeline = build_operation(self, operation, **kwargs)
+            results = list(pipeline.run(self.iter_blocks(block_size, hop=hop)))
+        log.info(f"✅ {len(results)} resultados.")
         return results
 
-    def _compute_fft(self, block, nfft=64):
+    def iter_blocks(self, block_size, partial=False, hop=None):
+        """
+        Genera bloques de perfiles (nCanales, block_size, nAlturas) que
+        empiezan cada `hop` perfiles (por defecto block_size: bloques
+        consecutivos; con hop < block_size los bloques se solapan).
+
+        Si la secuencia está cargada en memoria, devuelve vistas de self.data
+        (el solapamiento no copia datos). En modo lazy lee cada archivo por
+        porciones y arrastra los perfiles sobrantes de un archivo al bloque
+        siguiente, de modo que la memoria usada no depende del número de
+        archivos. Cada bloque se decodifica (si hay código) y, con n_coh > 1,
+        se forma integrando block_size * n_coh perfiles crudos. Con
+        partial=True también se genera el último bloque incompleto (los
+        perfiles que ningún bloque completo cubre).
+        """
+        hop = _check_hop(block_size, hop)
+        if self.data is not None:
+            n_profiles = self.data.shape[1]
+            n_blocks = n_blocks_for(n_profiles, block_size, hop)
+            for i in range(0, n_blocks * hop, hop):
+                yield self.data[:, i:i + block_size, :]
+            covered = (n_blocks - 1) * hop + block_size if n_blocks else 0
+            if covered < n_profiles:
+                if partial:
+                    yield self.data[:, n_blocks * hop:, :]
+                else:
+                    log.warning("⚠️ Bloque incompleto al final, omitido.")
+            return
+
+        if hop == block_size:
+            raw_size = block_size * self.n_coh
+            for i, raw in enumerate(self._iter_file_blocks(raw_size, partial=partial)):
+                yield self._prepare_block(raw, i * raw_size)
+            return
+        yield from self._iter_overlapped_blocks(block_size, hop, partial)
+
+    def _iter_overlapped_blocks(self, block_size, hop, partial=False):
+        """
+        Bloques solapados en modo lazy: se leen porciones de `hop` perfiles
+        en un buffer de block_size + hop perfiles y cada bloque completo se
+        entrega como copia; luego se descartan los `hop` perfiles más antiguos.
+        La última porción puede ser corta y aun así completar un bloque, por
+        eso siempre se lee con partial=True.
+        """
+        raw_size = hop * self.n_coh
+        buf = None
+        filled = 0
+        n_blocks = 0
+        for i, raw in enumerate(self._iter_file_blocks(raw_size, partial=True)):
+            chunk = self._prepare_block(raw, i * raw_size)
+            m = chunk.shape[1]
+            if buf is None:
+                buf = np.empty((chunk.shape[0], block_size + hop, chunk.shape[2]), dtype=chunk.dtype)
+            buf[:, filled:filled + m, :] = chunk
+            filled += m
+            if filled >= block_size:
+                yield buf[:, :block_size, :].copy()
+                n_blocks += 1
+                buf[:, :filled - hop, :] = buf[:, hop:filled, :]
+                filled -= hop
+        # Perfiles al final que ningún bloque completo cubre
+        if filled and (n_blocks == 0 or filled + hop > block_size):
+            if partial:
+                yield buf[:, :filled, :].copy()
+            else:
+                log.warning("⚠️ Bloque incompleto al final, omitido.")
+
+    def _iter_file_blocks(self, block_size, partial=False, sources=None, with_times=False):
+        """
+        Lee los archivos por porciones y genera bloques de perfiles crudos
+        (nCanales, block_size, nAlturas). Los perfiles sobrantes de un archivo
+        pasan al bloque siguiente. Con partial=True también se genera el
+        último bloque incompleto.
+
+        sources es un iterable de (archivo, p0, p1); por defecto los archivos
+        seleccionados de la secuencia. Con with_times=True se generan pares
+        (bloque, utctime del bloque).
+        """
+        if sources is None:
+            sources = ((file, p0, p1) for file, (p0, p1) in zip(self.files, self._profiles))
+        block = None
+        times = None
+        filled = 0
+        h0, h1 = self._heights
+        n_heights = h1 - h0
+        for file, pos, n_profiles in sources:
+            with open_file(file) as f:
+                read = channel_reader(f, self.channels)
+                utctime = f["Data/utctime"]
+                while pos < n_profiles:
+                    if block is None:
+                        block = np.empty((len(self.channels), block_size, n_heights),
+                                         dtype=self._dtype)
+                        times = np.empty(block_size) if with_times else None
+                        filled = 0
+                    take = min(block_size - filled, n_profiles - pos)
+                    with metrics.stage("read_blocks") as st:
+                        read(block, np.s_[pos:pos + take, h0:h1], np.s_[filled:filled + take])
+                        if with_times:
+                            utctime.read_direct(times, np.s_[pos:pos + take], np.s_[filled:filled + take])
+                        st.add(bytes=block[:, filled:filled + take].nbytes, profiles=take)
+                    filled += take
+                    pos += take
+                    if filled == block_size:
+                        yield (block, times) if with_times else block
+                        block = None
+
+        if block is not None:
+            if partial:
+                block = block[:, :filled, :]
+                yield (block, times[:filled]) if with_times else block
+            else:
+                log.warning("⚠️ Bloque incompleto al final, omitido.")
+
+    # -------------------------------------------------------------
+    # 🔹 Modo seguimiento (tiempo real)
+    # -------------------------------------------------------------
+
+    def follow(self, block_size, nfft=None, n_incoh=1, poll_interval=2.0,
+               settle_seconds=5.0, timeout=None, from_start=False):
+        """
+        Vigila la carpeta y procesa solo los archivos D*.hdf5 nuevos a medida
+        que se completan. Los perfiles se agregan al flujo de bloques (con
+        arrastre entre archivos, decodificación e integración coherente como
+        en iter_blocks) y por cada n_incoh bloques se genera un dict:
+
+            {"utctime": tiempo medio (s UTC),
+             "spectrum": (nCanales, nFFT, nAlturas) espectro integrado,
+             "power": (nCanales, nAlturas) columna RTI de potencia media,
+             "latency": segundos desde el cierre del último archivo leído}
+
+        El trabajo por archivo es constante, así que la latencia no crece
+        durante la noche. Los archivos seguidos no se agregan a la
+        secuencia: files, utctime y data siguen siendo los de la carga.
+
+        Parámetros:
+            block_size: int -> perfiles (integrados) por bloque
+            nfft: int -> puntos de la FFT (por defecto block_size)
+            n_incoh: int -> bloques promediados por producto
+            poll_interval: float -> segundos entre revisiones de la carpeta
+            settle_seconds: float -> un archivo se considera completo si no
+                            se modificó en este tiempo
+            timeout: float -> termina si no llegan archivos en este tiempo
+                     (None = sigue indefinidamente)
+            from_start: bool -> procesa también los archivos ya existentes
+        """
+        nfft = nfft or block_size
+        last_close = [0.0]
+        sources = self._watch_files(poll_interval, settle_seconds, timeout,
+                                    from_start, last_close)
+        raw_size = block_size * self.n_coh
+
+        acc_spec = acc_power = spec_buf = None
+        t_sum = 0.0
+        count = 0
+        for i, (raw, times) in enumerate(self._iter_file_blocks(raw_size, sources=sources,
+                                                                 with_times=True)):
+            block = self._prepare_block(raw, i * raw_size)
+            fft_res = _fft(block, nfft, 1)
+            spec_buf = power(fft_res, out=spec_buf)
+            block_power = np.mean(power(block), axis=1)
+            if acc_spec is None:
+                acc_spec = np.zeros_like(spec_buf)
+                acc_power = np.zeros_like(block_power)
+            acc_spec += spec_buf
+            acc_power += block_power
+            t_sum += times.mean()
+            count += 1
+
+            if count == n_incoh:
+                yield {
+                    "utctime": t_sum / n_incoh,
+                    "spectrum": np.fft.fftshift(acc_spec / n_incoh, axes=1),
+                    "power": acc_power / n_incoh,
+                    "latency": time.time() - last_close[0],
+                }
+                acc_spec[...] = 0
+                acc_power[...] = 0
+                t_sum = 0.0
+                count = 0
+
+    def _watch_files(self, poll_interval, settle_seconds, timeout, from_start, last_close):
+        """
+        Genera (archivo, p0, p1) por cada archivo nuevo y completo de la
+        carpeta, en orden. last_close[0] guarda el mtime del último archivo.
+        El estado (archivos vistos) es local: la selección de la secuencia
+        (files, utctime, data) no cambia.
+        """
+        seen = set() if from_start else {os.path.abspath(p) for p in self.files}
+        idle_since = time.time()
+        while True:
+            now = time.time()
+            new_files = [p for p in sorted(glob.glob(os.path.join(self.folder_path, self.pattern)))
+                         if os.path.abspath(p) not in seen]
+            ready = []
+            for file in new_files:
+                mtime = os.path.getmtime(file)
+                if now - mtime < settle_seconds:
+                    break  # los siguientes aún se están escribiendo
+                ready.append((file, mtime))
+
+            for file, mtime in ready:
+                try:
+                    with h5py.File(file, "r") as f:
+                        p0, p1 = profile_range(f["Data/utctime"][:], self.t_start, self.t_end)
+                except OSError:
+                    break  # archivo aún incompleto, se reintenta en la siguiente revisión
+                seen.add(os.path.abspath(file))
+                last_close[0] = mtime
+                idle_since = time.time()
+                log.info(f"📥 Nuevo archivo: {file}")
+                if p1 > p0:
+                    yield file, p0, p1
+
+            if timeout is not None and time.time() - idle_since > timeout:
+                log.info("⏹️ Sin archivos nuevos, fin del modo seguimiento.")
+                return
+            time.sleep(poll_interval)
+
+    def _compute_fft(self, block, nfft=64, workers=None):
         """Calcula la FFT a lo largo del eje de perfiles para un bloque."""
-        fft_res = np.fft.fftshift(np.fft.fft(block, n=nfft, axis=1), axes=1)
-        power_spectrum = np.abs(fft_res) ** 2
-        return power_spectrum
+        return Spectrum(nfft, workers)(block)
+
+    def _compute_fft_batched(self, block_size, nfft=64, workers=None, hop=None, window=None):
+        """
+        Calcula el espectro de potencia de todos los bloques en lotes.
+
+        Los datos se ven como (nCanales, nBloques, nAlturas, block_size) con
+        sliding_window_view, sin copiar aunque los bloques se solapen (hop),
+        y se aplica una FFT por lote de bloques (BATCH_BYTES por lote) sobre
+        el eje de perfiles, de modo que los temporales caben en caché y el
+        solapamiento solo cuesta tiempo de FFT. El resultado es un ndarray
+        contiguo (nBloques, nCanales, nFFT, nAlturas), de modo que result[i]
+        tiene la misma forma que un bloque de la lista.
+        """
+        hop = _check_hop(block_size, hop)
+        n_blocks = n_blocks_for(self.n_profiles, block_size, hop)
+        if n_blocks == 0:
+            log.warning("⚠️ Bloque incompleto al final, omitido.")
+            return np.empty((0, len(self.channels), nfft, len(self.heightList)),
+                            dtype=real_dtype(self._dtype))
+        if self.data is None:
+            # Modo lazy: FFT por bloque, pero en un único arreglo de salida
+            spectrum = Spectrum(nfft, workers, window=window)
+            results = None
+            for i, block in enumerate(self.iter_blocks(block_size, hop=hop)):
+                res = spectrum(block)
+                if results is None:
+                    results = np.empty((n_blocks,) + res.shape, dtype=res.real.dtype)
+                results[i] = res
+            return results
+
+        n_channels, n_profiles, n_heights = self.data.shape
+        if n_blocks and (n_blocks - 1) * hop + block_size < n_profiles:
+            log.warning("⚠️ Bloque incompleto al final, omitido.")
+        blocks = sliding_window_view(self.data, block_size, axis=1)[:, ::hop][:, :n_blocks]
+        taper = get_window(window, block_size)
+
+        results = np.empty((n_blocks, n_channels, nfft, n_heights),
+                           dtype=real_dtype(self.data.dtype))
+        out = results.transpose(1, 0, 3, 2)  # vista (nCanales, nBloques, nAlturas, nFFT)
+        step = max(1, BATCH_BYTES // (n_channels * n_heights * nfft * self.data.itemsize))
+        for b0 in range(0, n_blocks, step):
+            batch = blocks[:, b0:b0 + step]
+            if taper is not None:
+                batch = batch * taper
+            fft_res = np.fft.fftshift(_fft(batch, nfft, -1, workers), axes=-1)
+            power(fft_res, out=out[:, b0:b0 + step])
+        return results
+
+
+def integrate_times(utctime, n_coh):
+    """Tiempo medio de cada grupo de n_coh perfiles integrados."""
+    m = len(utctime) // n_coh
+    return utctime[:m * n_coh].reshape(m, n_coh).mean(axis=1)
+
+
+def n_blocks_for(n_profiles, block_size, hop=None):
+    """Número de bloques completos de block_size perfiles que empiezan cada hop perfiles."""
+    hop = hop or block_size
+    return (n_profiles - block_size) // hop + 1 if n_profiles >= block_size else 0
+
+
+def block_times(utctime, block_size, hop=None):
+    """Tiempo medio de cada bloque completo (solapado si hop < block_size)."""
+    utctime = np.asarray(utctime, dtype=np.float64)
+    starts = np.arange(n_blocks_for(len(utctime), block_size, hop)) * (hop or block_size)
+    if len(utctime) == 0:
+        return utctime
+    t0 = utctime[0]
+    csum = np.concatenate(([0.0], np.cumsum(utctime - t0)))
+    return t0 + (csum[starts + block_size] - csum[starts]) / block_size
+
+
+def _check_hop(block_size, hop):
+    """Valida hop (0 < hop <= block_size) y devuelve block_size si es None."""
+    if hop is None:
+        return block_size
+    if not 0 < hop <= block_size:
+        raise ValueError(f"hop debe estar entre 1 y block_size ({block_size}), no {hop}")
+    return hop
 
 
 # -------------------------------------------------------------
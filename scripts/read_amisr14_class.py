@@ -7,11 +7,21 @@ Descripción:
 
 Estructura del objeto:
     dataOut.data        -> ndarray de forma (nCanales, nPerfiles, nAlturas)
-    dataOut.utctime     -> ndarray (nPerfiles,)
+    dataOut.channels    -> lista de canales leídos (p. ej. [0, 4])
+    dataOut.utctime     -> ndarray (nPerfiles,) segundos UTC
+    dataOut.times       -> ndarray datetime64[us] (nPerfiles,) UTC
+    dataOut.time_labels(start, stop) -> etiquetas de hora local (Lima), bajo demanda
     dataOut.heightList  -> ndarray (nAlturas,)
 
+Formatos de archivo (se detectan al abrir, ver channel_reader):
+    - Adquisición: un dataset 2-D por canal en Data/data_pre/channelNN
+    - Archivo reempaquetado (archive_amisr14.py): un único dataset
+      Data/voltages (nCanales, nPerfiles, nAlturas) por bloques de tiempo,
+      con los números de canal en Data/channels
+    Ambos guardan Data/utctime y Metadata/heightList.
+
 Uso:
-    python read_amisr14_class.py --file ./D0001.hdf5
+    python read_amisr14_class.py --file ./D0001.hdf5 --channels 0 4
 """
 
 import h5py
@@ -20,55 +30,330 @@ import argparse
 from datetime import datetime
 import pytz
 
+from power_amisr14 import DTYPE
+from metrics_amisr14 import get_logger, metrics
+
+log = get_logger("read_amisr14_class")
+
 # Zona horaria local (Lima, Perú)
 tz_local = pytz.timezone("America/Lima")
 
+# Ruta de los datasets de voltaje por canal
+CHANNEL_GROUP = "Data/data_pre"
+CHANNEL_FMT = CHANNEL_GROUP + "/channel{:02d}"
+
+# Dataset único (canal, perfil, altura) y números de canal de los archivos reempaquetados
+ARCHIVE_DATASET = "Data/voltages"
+ARCHIVE_CHANNELS = "Data/channels"
+
+# Caché de chunks HDF5 al leer voltajes: debe caber al menos un chunk por
+# canal para que leer un bloque corto no descomprima el chunk completo cada vez
+CHUNK_CACHE_BYTES = 64 * 2**20
+
+# Rutas posibles de la lista de alturas (según la versión del archivo)
+HEIGHT_PATHS = ("Metadata/heightList", "Metadata/processingHeaderObj/heightList")
+
 
 class DataOut:
     """Clase contenedora de los datos del radar AMISR-14."""
+    __slots__ = ("data", "channels", "utctime", "heightList", "info")
+
     def __init__(self):
         self.data = None          # ndarray (nCanales, nPerfiles, nAlturas)
+        self.channels = None      # lista de canales leídos
         self.utctime = None       # ndarray (nPerfiles,)
         self.heightList = None    # ndarray (nAlturas,)
-        self.time_labels = None   # lista de datetimes (hora local)
         self.info = {}            # metadatos (n_canales, n_perfiles, n_alturas)
 
+    @property
+    def times(self):
+        """utctime como ndarray datetime64[us] (UTC)."""
+        return to_datetime64(self.utctime)
+
+    def time_labels(self, start=0, stop=None):
+        """Etiquetas 'YYYY-MM-DD HH:MM:SS' en hora local de los perfiles [start:stop], bajo demanda."""
+        return local_labels(self.times[start:stop])
+
     def resumen(self):
-        """Imprime un resumen general del contenido."""
-        print("\n📦 Resumen del objeto dataOut:")
-        print(f"   - Canales:  {self.info.get('n_channels', '?')}")
-        print(f"   - Perfiles: {self.info.get('n_profiles', '?')}")
-        print(f"   - Alturas:  {self.info.get('n_heights', '?')}")
+        """Escribe en el log un resumen general del contenido."""
+        lines = [
+            "📦 Resumen del objeto dataOut:",
+            f"   - Canales:  {self.info.get('n_channels', '?')} {self.channels or ''}",
+            f"   - Perfiles: {self.info.get('n_profiles', '?')}",
+            f"   - Alturas:  {self.info.get('n_heights', '?')}",
+        ]
         if self.utctime is not None:
-            print(f"   - Primer timestamp (local): {self.time_labels[0].strftime('%Y-%m-%d %H:%M:%S')}")
-        print("------------------------------------------------------------")
+            lines.append(f"   - Primer timestamp (local): {local_labels(to_datetime64(self.utctime[:1]))[0]}")
+        lines.append("------------------------------------------------------------")
+        log.info("\n".join(lines), extra={"fields": {**self.info, "channels": self.channels}})
+
+
+class _ArchiveChannel:
+    """
+    Vista de un canal del dataset Data/voltages con la misma interfaz que
+    un dataset channelNN (shape, dtype, read_direct), para leer ambos
+    formatos con el mismo código.
+    """
+    __slots__ = ("ds", "index")
+
+    def __init__(self, ds, index):
+        self.ds = ds
+        self.index = index
+
+    @property
+    def shape(self):
+        return self.ds.shape[1:]
+
+    @property
+    def dtype(self):
+        return self.ds.dtype
+
+    @property
+    def chunks(self):
+        return self.ds.chunks
+
+    @property
+    def compression(self):
+        return self.ds.compression
+
+    def read_direct(self, dest, source_sel=(), dest_sel=None):
+        if not isinstance(source_sel, tuple):
+            source_sel = (source_sel,)
+        self.ds.read_direct(dest, (self.index,) + source_sel, dest_sel)
+
+
+def open_file(file_path):
+    """Abre un archivo AMISR-14 para leer voltajes (con caché de chunks amplia)."""
+    return h5py.File(file_path, "r", rdcc_nbytes=CHUNK_CACHE_BYTES, rdcc_nslots=10007)
+
+
+def is_archive(f):
+    """True si el archivo abierto tiene el formato reempaquetado (Data/voltages)."""
+    return ARCHIVE_DATASET in f
+
+
+def list_channels(f):
+    """Devuelve los números de canal disponibles en un archivo HDF5 abierto."""
+    if is_archive(f):
+        return [int(ch) for ch in f[ARCHIVE_CHANNELS][:]]
+    names = f[CHANNEL_GROUP].keys()
+    return sorted(int(n[len("channel"):]) for n in names if n.startswith("channel"))
+
 
+def channel_datasets(f, channels):
+    """
+    Datasets (nPerfiles, nAlturas) de los canales pedidos, en cualquiera de
+    los dos formatos. Admiten .shape, .dtype y .read_direct().
+    """
+    if is_archive(f):
+        ds = f[ARCHIVE_DATASET]
+        index = {ch: i for i, ch in enumerate(list_channels(f))}
+        return [_ArchiveChannel(ds, index[ch]) for ch in channels]
+    return [f[CHANNEL_FMT.format(ch)] for ch in channels]
 
-def read_amisr14_file(file_path):
-    """Lee un archivo HDF5 del radar AMISR-14 y devuelve un objeto DataOut."""
-    print(f"\n📂 Leyendo archivo: {file_path}")
+
+def channel_reader(f, channels):
+    """
+    Devuelve read(dest, source_sel, dest_sel=()) que lee los canales pedidos
+    en dest (nCanales, ...), C-contiguo. source_sel selecciona (perfiles,
+    alturas) y dest_sel los ejes de dest que siguen al de canales.
+
+    En un archivo reempaquetado, una selección ascendente de canales se lee
+    con un solo read_direct sobre Data/voltages (un hiperslab para todos los
+    canales); en el formato de adquisición se lee un dataset por canal.
+    """
+    if is_archive(f):
+        ds = f[ARCHIVE_DATASET]
+        index = {ch: i for i, ch in enumerate(list_channels(f))}
+        rows = [index[ch] for ch in channels]
+        if rows == list(range(rows[0], rows[0] + len(rows))):
+            chan_sel = slice(rows[0], rows[0] + len(rows))
+        elif all(a < b for a, b in zip(rows, rows[1:])):
+            chan_sel = rows
+        else:
+            chan_sel = None
+        if chan_sel is not None:
+            def read(dest, source_sel, dest_sel=()):
+                if not isinstance(source_sel, tuple):
+                    source_sel = (source_sel,)
+                if not isinstance(dest_sel, tuple):
+                    dest_sel = (dest_sel,)
+                ds.read_direct(dest, (chan_sel,) + source_sel, (slice(None),) + dest_sel)
+            return read
+
+    datasets = channel_datasets(f, channels)
+
+    def read(dest, source_sel, dest_sel=()):
+        for c, ds_c in enumerate(datasets):
+            ds_c.read_direct(dest[c], source_sel, dest_sel or None)
+    return read
+
+
+def read_heights(f):
+    """Lee heightList (en metros) de un archivo HDF5 abierto."""
+    for path in HEIGHT_PATHS:
+        if path in f:
+            return f[path][:]
+    raise KeyError(f"No se encontró heightList (rutas buscadas: {HEIGHT_PATHS})")
+
+
+def resolve_channels(f, channels=None):
+    """
+    Valida la selección de canales contra los disponibles en el archivo.
+    Si channels es None se devuelve solo el primer canal disponible
+    (channel00 en los archivos de adquisición), como antes de admitir
+    lecturas multicanal; para leer todos hay que pedirlos con list_channels(f).
+    """
+    available = list_channels(f)
+    if channels is None:
+        return available[:1]
+    channels = [int(ch) for ch in channels]
+    missing = [ch for ch in channels if ch not in available]
+    if missing:
+        raise ValueError(f"Canales {missing} no disponibles (disponibles: {available})")
+    return channels
+
+
+def to_datetime64(utctime):
+    """Segundos UTC (float) -> ndarray datetime64[us] (UTC), vectorizado."""
+    return np.round(np.asarray(utctime, dtype=np.float64) * 1e6).astype("datetime64[us]")
+
+
+def to_local(times, tz=tz_local):
+    """
+    datetime64 UTC -> datetime64 en hora local (sin zona), vectorizado.
+    Si el desfase es el mismo al inicio y al final del rango (Lima no tiene
+    horario de verano) se aplica como un solo desplazamiento.
+    """
+    times = np.asarray(times, dtype="datetime64[us]")
+    if times.size == 0:
+        return times
+    offsets = {pytz.UTC.localize(t.astype(datetime)).astimezone(tz).utcoffset()
+               for t in (times.min(), times.max())}
+    if len(offsets) == 1:
+        return times + np.timedelta64(offsets.pop())
+    return np.array([pytz.UTC.localize(t.astype(datetime)).astimezone(tz).replace(tzinfo=None)
+                     for t in times.ravel()], dtype="datetime64[us]").reshape(times.shape)
+
+
+def local_labels(times, tz=tz_local):
+    """Etiquetas de texto 'YYYY-MM-DD HH:MM:SS' en hora local para un arreglo datetime64."""
+    return np.char.replace(np.datetime_as_string(to_local(times, tz), unit="s"), "T", " ")
+
+
+def profile_range(utctime, t_start=None, t_end=None):
+    """Rango [p0, p1) de perfiles con t_start <= utctime <= t_end (segundos UTC)."""
+    p0 = 0 if t_start is None else int(np.searchsorted(utctime, t_start, side="left"))
+    p1 = len(utctime) if t_end is None else int(np.searchsorted(utctime, t_end, side="right"))
+    return p0, max(p0, p1)
+
+
+def height_range(heightList, h_min=None, h_max=None):
+    """
+    Rango [h0, h1) de alturas con h_min <= altura <= h_max. h_min y h_max
+    se dan en km; heightList está en metros (como en Metadata/heightList).
+    """
+    heights_km = np.asarray(heightList) / 1000.0
+    h0 = 0 if h_min is None else int(np.searchsorted(heights_km, h_min, side="left"))
+    h1 = len(heights_km) if h_max is None else int(np.searchsorted(heights_km, h_max, side="right"))
+    return h0, max(h0, h1)
+
+
+def _memmap_dataset(file_path, ds):
+    """
+    Devuelve un np.memmap sobre un dataset HDF5 contiguo y sin compresión,
+    o None si el dataset no se puede mapear directamente. Un canal de un
+    archivo reempaquetado se mapea como vista del dataset Data/voltages.
+    """
+    if isinstance(ds, _ArchiveChannel):
+        mapped = _memmap_dataset(file_path, ds.ds)
+        return None if mapped is None else mapped[ds.index]
+    if ds.chunks is not None or ds.compression is not None:
+        return None
+    if not ds.dtype.isnative:
+        return None
+    offset = ds.id.get_offset()
+    if offset is None:
+        return None
+    return np.memmap(file_path, dtype=ds.dtype, mode="r", offset=offset, shape=ds.shape)
+
+
+def read_amisr14_file(file_path, channels=None, out=None, use_mmap=False,
+                      t_start=None, t_end=None, h_min=None, h_max=None, dtype=DTYPE):
+    """
+    Lee un archivo HDF5 del radar AMISR-14 (de adquisición o reempaquetado
+    con archive_amisr14.py) y devuelve un objeto DataOut.
+
+    Parámetros:
+        file_path : str
+        channels : list[int], opcional
+            Canales a leer (p. ej. [0, 4]). Por defecto solo el primero (channel00).
+            Los canales no seleccionados no se leen del disco.
+        out : np.ndarray, opcional
+            Buffer de salida (nCanales, nPerfiles, nAlturas). Los datos se
+            escriben directamente en él (sin arreglos temporales).
+        use_mmap : bool
+            Si se pide un solo canal y su dataset es contiguo y sin compresión,
+            dataOut.data es un np.memmap de solo lectura sobre el archivo.
+            Si además se da `out`, los datasets contiguos se copian desde el
+            memmap al buffer; la copia libera el GIL, por lo que varios hilos
+            pueden leer archivos en paralelo (h5py serializa sus llamadas).
+        t_start, t_end : float, opcional
+            Ventana de tiempo (segundos UTC, como Data/utctime).
+        h_min, h_max : float, opcional
+            Rango de alturas en km.
+            Solo se lee del disco el hiperslab (perfiles, alturas) seleccionado.
+        dtype : tipo numpy, opcional
+            Precisión de dataOut.data (por defecto complex64). HDF5 convierte
+            al leer si el archivo tiene otra precisión. Si se da `out`, manda
+            el tipo de `out`.
+    """
+    log.info(f"📂 Leyendo archivo: {file_path}")
 
     dataOut = DataOut()
 
-    with h5py.File(file_path, "r") as f:
-        # Leer canal principal (por ahora solo channel00)
-        ch0 = f["Data/data_pre/channel00"][:]  # (nPerfiles, nAlturas)
-        n_profiles, n_heights = ch0.shape
+    with metrics.stage("read_file") as st, open_file(file_path) as f:
+        channels = resolve_channels(f, channels)
+        datasets = channel_datasets(f, channels)  # (nPerfiles, nAlturas)
 
-        # Preparar estructura 3D (nCanales, nPerfiles, nAlturas)
-        n_channels = 1
-        dataOut.data = np.zeros((n_channels, n_profiles, n_heights), dtype=ch0.dtype)
-        dataOut.data[0, :, :] = ch0
+        # Resolver la selección contra utctime y heightList
+        utctime = f["Data/utctime"][:]
+        heightList = read_heights(f)
+        p0, p1 = profile_range(utctime, t_start, t_end)
+        h0, h1 = height_range(heightList, h_min, h_max)
+        sel = np.s_[p0:p1, h0:h1]
+        n_profiles, n_heights = p1 - p0, h1 - h0
 
-        # Leer tiempos y alturas
-        dataOut.utctime = f["Data/utctime"][:]
-        dataOut.heightList = f["Metadata/heightList"][:]
+        # Preparar estructura 3D (nCanales, nPerfiles, nAlturas)
+        n_channels = len(channels)
+        mapped = None
+        if use_mmap and out is None and n_channels == 1:
+            if datasets[0].dtype == dtype:
+                mapped = _memmap_dataset(file_path, datasets[0])
+        if mapped is not None:
+            dataOut.data = mapped[np.newaxis, p0:p1, h0:h1]
+        else:
+            if out is None:
+                out = np.empty((n_channels, n_profiles, n_heights), dtype=dtype)
+            elif out.shape != (n_channels, n_profiles, n_heights):
+                raise ValueError(f"Buffer de salida con forma {out.shape}, "
+                                 f"se esperaba {(n_channels, n_profiles, n_heights)}")
+            sources = [_memmap_dataset(file_path, ds) if use_mmap else None for ds in datasets]
+            if out.flags.c_contiguous and all(src is None for src in sources):
+                channel_reader(f, channels)(out, sel)
+            else:
+                for i, (ds, src) in enumerate(zip(datasets, sources)):
+                    if src is not None:
+                        np.copyto(out[i], src[sel])
+                    else:
+                        ds.read_direct(out[i], sel)
+            dataOut.data = out
+        dataOut.channels = channels
 
-    # Convertir tiempos UTC a hora local
-    dataOut.time_labels = [
-        datetime.utcfromtimestamp(t).replace(tzinfo=pytz.UTC).astimezone(tz_local)
-        for t in dataOut.utctime
-    ]
+        # Tiempos y alturas de la selección
+        dataOut.utctime = utctime[p0:p1]
+        dataOut.heightList = heightList[h0:h1]
+        st.add(bytes=dataOut.data.nbytes if mapped is None else 0, profiles=n_profiles)
 
     # Guardar metadatos
     dataOut.info = {
@@ -84,6 +369,8 @@ def read_amisr14_file(file_path):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Lee datos del radar AMISR-14 en un objeto DataOut.")
     parser.add_argument("--file", required=True, help="Ruta al archivo .hdf5")
+    parser.add_argument("--channels", type=int, nargs="+", default=None,
+                        help="Canales a leer (por defecto el 0)")
     args = parser.parse_args()
 
-    dataOut = read_amisr14_file(args.file)
\ No newline at end of file
+    dataOut = read_amisr14_file(args.file, channels=args.channels)
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+Script: rti_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Motor RTI (Range-Time Intensity) multi-resolución para el radar AMISR-14.
+
+    build_rti() recorre una AMISR14Sequence por bloques y reduce la potencia
+    |x|^2 a lo largo del tiempo (promedio o máximo por intervalo) hasta un
+    número objetivo de columnas, normalmente la resolución de la pantalla.
+    Nunca se construye la matriz de potencia completa ni una lista de
+    datetimes por perfil: la memoria depende del número de columnas, no de
+    la duración de la noche.
+
+    draw_rti() grafica el resultado en dB con el piso de ruido (percentil 5,
+    ver noise_amisr14.NoiseEstimator) como mínimo de la escala de colores.
+
+    Para navegar semanas de datos, build_rti_pyramid() escribe en un único
+    HDF5 chunked una pirámide de niveles decimados en tiempo (1x, 4x, 16x,
+    ...) y RTIPyramid.query() lee solo el tramo del nivel más grueso que
+    aún cubre el ancho en píxeles pedido.
+
+Uso:
+    seq = AMISR14Sequence(folder, channels=[4], lazy=True)
+    noise = NoiseEstimator()
+    times, heights_km, power = build_rti(seq, n_columns=1200, channel=4, noise=noise)
+    draw_rti(times, heights_km, power, title="RTI Canal 04", noise=noise)
+
+    build_rti_pyramid(seq, "rti_pyramid.h5", channel=4)
+    pyramid = RTIPyramid("rti_pyramid.h5")
+    times, heights_km, power, level = pyramid.query(t_start, t_end, pixel_width=1200)
+"""
+
+import bisect
+
+import h5py
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+
+from noise_amisr14 import NoiseEstimator
+from power_amisr14 import power as block_power, to_db
+from process_amisr14_sequence import integrate_times
+from read_amisr14_class import to_datetime64, tz_local
+from metrics_amisr14 import get_logger, metrics
+
+log = get_logger("rti_amisr14")
+
+_REDUCERS = {"mean": np.mean, "max": np.max}
+
+
+def build_rti(seq, n_columns=1200, channel=None, reduce="mean", chunk_profiles=4096, noise=None):
+    """
+    Calcula un RTI de potencia reducido a como máximo n_columns columnas.
+
+    Parámetros:
+        seq : AMISR14Sequence (se recomienda lazy=True)
+        n_columns : int -> número objetivo de columnas (tiempo)
+        channel : int -> número de canal (por defecto el primero de seq.channels)
+        reduce : str -> 'mean' (integración) o 'max' (max pooling) por columna
+        chunk_profiles : int -> perfiles leídos por iteración
+        noise : NoiseEstimator -> si se indica, se actualiza con cada tramo
+                de columnas (para pasarlo luego a draw_rti o calcular SNR)
+
+    Devuelve:
+        times : ndarray (nColumnas,) utctime medio de cada columna
+        heights_km : ndarray (nAlturas,)
+        power : ndarray float32 (nColumnas, nAlturas), potencia lineal
+    """
+    if reduce not in _REDUCERS:
+        raise ValueError(f"Reducción '{reduce}' no reconocida (use {list(_REDUCERS)})")
+    reducer = _REDUCERS[reduce]
+    ci = 0 if channel is None else seq.channels.index(channel)
+
+    n_profiles = len(seq.utctime)
+    n_heights = len(seq.heightList)
+    bin_size = max(1, -(-n_profiles // n_columns))  # perfiles por columna
+    n_cols = n_profiles // bin_size
+    chunk = bin_size * max(1, chunk_profiles // bin_size)
+
+    log.info(f"🖼️ RTI: {n_profiles} perfiles -> {n_cols} columnas ({bin_size} perfiles/columna, {reduce})")
+    power = np.empty((n_cols, n_heights), dtype=np.float32)
+    col = 0
+    for cols in _iter_columns(seq, ci, bin_size, reducer, chunk):
+        power[col:col + len(cols)] = cols
+        col += len(cols)
+        if noise is not None:
+            noise.update(cols)
+
+    times = integrate_times(seq.utctime, bin_size)
+    return times[:col], np.asarray(seq.heightList) / 1000.0, power[:col]
+
+
+def _iter_columns(seq, ci, bin_size, reducer, chunk):
+    """Genera columnas RTI (m, nAlturas) reduciendo bin_size perfiles cada una."""
+    n_heights = len(seq.heightList)
+    buf = None  # potencia del tramo, reutilizada entre iteraciones
+    for block in seq.iter_blocks(chunk, partial=True):
+        m = block.shape[1] // bin_size
+        if m == 0:
+            break
+        n = m * bin_size
+        if buf is None or len(buf) != n:
+            buf = np.empty((n, n_heights), dtype=np.float32)
+        with metrics.stage("rti_columns") as st:
+            block_power(block[ci, :n, :], out=buf)
+            cols = reducer(buf.reshape(m, bin_size, n_heights), axis=1).astype(np.float32, copy=False)
+            st.add(profiles=n)
+        yield cols
+
+
+# -------------------------------------------------------------
+# 🔹 Pirámide de resoluciones para zoom interactivo
+# -------------------------------------------------------------
+
+def _append(ds, arr):
+    n = ds.shape[0]
+    ds.resize(n + len(arr), axis=0)
+    ds[n:] = arr
+
+
+def build_rti_pyramid(seq, output_path, channel=None, factor=4, base_bin=1,
+                      min_columns=512, reduce="mean", chunk_profiles=4096):
+    """
+    Recorre la secuencia una sola vez y escribe una pirámide RTI en HDF5.
+
+    El nivel 0 tiene una columna por cada base_bin perfiles; el nivel k
+    reduce factor**k columnas del nivel 0 (promedio o máximo). Se crean
+    niveles mientras tengan al menos min_columns columnas.
+
+    Estructura de salida:
+        heightList           -> (nAlturas,) en km
+        level{k}/utctime     -> (nColumnas_k,)
+        level{k}/power       -> (nColumnas_k, nAlturas) potencia lineal, chunked
+        level{k}.attrs["profiles_per_column"]
+    """
+    if reduce not in _REDUCERS:
+        raise ValueError(f"Reducción '{reduce}' no reconocida (use {list(_REDUCERS)})")
+    reducer = _REDUCERS[reduce]
+    ci = 0 if channel is None else seq.channels.index(channel)
+
+    n_heights = len(seq.heightList)
+    n_base = len(seq.utctime) // base_bin
+    n_levels = 1
+    while n_base // factor ** n_levels >= min_columns:
+        n_levels += 1
+    chunk = base_bin * max(1, chunk_profiles // base_bin)
+    base_times = integrate_times(seq.utctime, base_bin)
+
+    log.info(f"🧱 Pirámide RTI: {n_base} columnas base, {n_levels} niveles (factor {factor})")
+    with h5py.File(output_path, "w") as f:
+        f["heightList"] = np.asarray(seq.heightList) / 1000.0
+        f.attrs["factor"] = factor
+        f.attrs["n_levels"] = n_levels
+        f.attrs["reduce"] = reduce
+        levels = []
+        for k in range(n_levels):
+            g = f.create_group(f"level{k}")
+            g.attrs["profiles_per_column"] = base_bin * factor ** k
+            levels.append((
+                g.create_dataset("utctime", shape=(0,), maxshape=(None,), dtype="f8", chunks=(4096,)),
+                g.create_dataset("power", shape=(0, n_heights), maxshape=(None, n_heights),
+                                 dtype="f4", chunks=(256, n_heights)),
+            ))
+
+        pending = [(np.empty((0, n_heights), np.float32), np.empty(0))] * n_levels
+
+        def push(k, power, times):
+            ds_time, ds_power = levels[k]
+            _append(ds_power, power)
+            _append(ds_time, times)
+            if k + 1 == n_levels:
+                return
+            p = np.concatenate([pending[k][0], power])
+            t = np.concatenate([pending[k][1], times])
+            m = len(p) // factor
+            if m:
+                push(k + 1,
+                     reducer(p[:m * factor].reshape(m, factor, n_heights), axis=1),
+                     t[:m * factor].reshape(m, factor).mean(axis=1))
+            pending[k] = (p[m * factor:], t[m * factor:])
+
+        col = 0
+        for cols in _iter_columns(seq, ci, base_bin, reducer, chunk):
+            push(0, cols, base_times[col:col + len(cols)])
+            col += len(cols)
+
+    log.info(f"✅ Pirámide guardada en {output_path}")
+
+
+class RTIPyramid:
+    """Consulta de una pirámide RTI creada con build_rti_pyramid()."""
+
+    def __init__(self, path):
+        self.f = h5py.File(path, "r")
+        self.n_levels = int(self.f.attrs["n_levels"])
+        self.heights_km = self.f["heightList"][:]
+
+    def query(self, t_start=None, t_end=None, pixel_width=1200):
+        """
+        Devuelve (times, heights_km, power, level) para la ventana
+        [t_start, t_end] usando el nivel más grueso que aún tiene al menos
+        pixel_width columnas en la ventana (o el nivel 0 si ninguno alcanza).
+        Los límites se buscan por bisección sobre el dataset utctime en
+        disco (unas pocas lecturas de un elemento por nivel), y solo se lee
+        el tramo [i0, i1) del nivel elegido.
+        """
+        for level in range(self.n_levels - 1, -1, -1):
+            ds_time = self.f[f"level{level}/utctime"]
+            i0 = 0 if t_start is None else bisect.bisect_left(ds_time, t_start)
+            i1 = len(ds_time) if t_end is None else bisect.bisect_right(ds_time, t_end)
+            i1 = max(i0, i1)
+            if i1 - i0 >= pixel_width or level == 0:
+                power = self.f[f"level{level}/power"][i0:i1]
+                return ds_time[i0:i1], self.heights_km, power, level
+
+    def close(self):
+        self.f.close()
+
+
+def draw_rti(times, heights_km, power, title="RTI de Potencia en dB",
+             dynamic_range=40, cmap="jet", figsize=(14, 6), noise=None):
+    """
+    Grafica un RTI de potencia en dB (eje X en hora local de Lima).
+
+    Parámetros:
+        times : ndarray (nColumnas,) utctime
+        heights_km : ndarray (nAlturas,)
+        power : ndarray (nColumnas, nAlturas) potencia lineal
+        dynamic_range : float -> vmax = piso de ruido + dynamic_range (dB)
+        noise : NoiseEstimator -> estimador ya alimentado (p. ej. por
+                build_rti); si es None se estima con la potencia graficada
+    """
+    power_db = to_db(power)
+
+    # Estimar piso de ruido (percentil bajo del histograma en dB)
+    if noise is None:
+        noise = NoiseEstimator()
+        noise.update_db(power_db)
+    vmin, vmax = noise.color_limits(dynamic_range)
+    log.info(f"Piso de ruido estimado: {vmin:.2f} dB")
+    log.info(f"Escala de colores: vmin={vmin:.2f}, vmax={vmax:.2f}")
+
+    # Eje X numérico de matplotlib (días), sin objetos datetime por columna
+    x = mdates.date2num(to_datetime64(times))
+
+    fig, ax = plt.subplots(figsize=figsize, constrained_layout=True)
+    ax.xaxis_date(tz=tz_local)
+    pcm = ax.pcolormesh(x, heights_km, power_db.T,
+                        shading="auto", cmap=cmap, vmin=vmin, vmax=vmax)
+
+    ax.set_ylabel("Altura (km)")
+    ax.set_xlabel("Hora local (Lima, UTC-5)")
+    ax.set_title(title)
+
+    # Eje X con tiempo formateado
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=tz_local))
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=30, ha="right")
+
+    # Barra de color
+    cbar = plt.colorbar(pcm, ax=ax, orientation="vertical")
+    cbar.set_label("Potencia (dB)")
+
+    plt.show()
+    return fig, ax
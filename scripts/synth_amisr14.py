@@ -0,0 +1,109 @@
+"""
+Script: synth_amisr14.py
+Autor: Alexander Valdez
+Descripción:
+    Genera archivos HDF5 sintéticos con la misma estructura que los del radar
+    AMISR-14, para probar y medir los scripts sin datos reales.
+
+    Estructura de cada archivo D*.hdf5:
+        Data/data_pre/channelNN -> (nPerfiles, nAlturas) complex64
+        Data/utctime            -> (nPerfiles,) segundos UTC
+        Metadata/heightList     -> (nAlturas,) en metros
+
+    Cada canal contiene ruido blanco complejo más un eco de Spread F: una
+    capa de alturas que sube lentamente, con desplazamiento Doppler y ancho
+    espectral configurables (fase con caminata aleatoria) y una fase distinta
+    por canal. Los archivos son consecutivos en tiempo.
+
+Uso:
+    python synth_amisr14.py --output ./synthetic --files 4 --channels 2 --profiles 2000 --heights 400
+"""
+
+import argparse
+import os
+
+import h5py
+import numpy as np
+
+from read_amisr14_class import CHANNEL_FMT
+from metrics_amisr14 import get_logger
+
+log = get_logger("synth_amisr14")
+
+
+def write_synthetic_files(output_dir, n_files=3, n_channels=1, n_profiles=1000, n_heights=200,
+                          ipp_seconds=0.005, t0=1.7e9, h0_km=80.0, dh_km=1.5,
+                          snr_db=10.0, doppler_hz=20.0, width_hz=5.0,
+                          layer_km=(250.0, 350.0), rise_km_per_hour=30.0, seed=0):
+    """
+    Escribe n_files archivos sintéticos en output_dir y devuelve sus rutas.
+
+    Parámetros:
+        n_files, n_channels, n_profiles, n_heights : forma de los datos
+            (n_profiles es el número de perfiles por archivo)
+        ipp_seconds : float -> intervalo entre perfiles
+        t0 : float -> utctime del primer perfil (segundos UTC)
+        h0_km, dh_km : float -> primera altura y paso de heightList
+        snr_db : float -> SNR del eco respecto al ruido (potencia 1 por canal)
+        doppler_hz, width_hz : float -> desplazamiento y ancho espectral del eco
+        layer_km : (float, float) -> alturas inicial y final de la capa
+        rise_km_per_hour : float -> velocidad de ascenso de la capa
+        seed : int -> semilla del generador aleatorio
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    heights_km = h0_km + dh_km * np.arange(n_heights)
+    amplitude = np.sqrt(10 ** (snr_db / 10))
+    channel_phase = np.exp(2j * np.pi * rng.random(n_channels)).astype(np.complex64)
+    noise_scale = np.float32(np.sqrt(0.5))
+
+    paths = []
+    phase = 0.0
+    for k in range(n_files):
+        t = t0 + ipp_seconds * (k * n_profiles + np.arange(n_profiles))
+
+        # Eco: fase con deriva Doppler y caminata aleatoria (ancho espectral)
+        steps = 2 * np.pi * doppler_hz * ipp_seconds + \
+            rng.standard_normal(n_profiles) * np.sqrt(2 * np.pi * width_hz * ipp_seconds)
+        echo_phase = phase + np.cumsum(steps)
+        phase = echo_phase[-1]
+        echo = (amplitude * np.exp(1j * echo_phase)).astype(np.complex64)
+
+        # Capa que sube con el tiempo: máscara (nPerfiles, nAlturas)
+        rise = rise_km_per_hour * (t - t0) / 3600.0
+        layer = ((heights_km[np.newaxis, :] >= layer_km[0] + rise[:, np.newaxis]) &
+                 (heights_km[np.newaxis, :] <= layer_km[1] + rise[:, np.newaxis]))
+
+        path = os.path.join(output_dir, f"D{k:07d}.hdf5")
+        with h5py.File(path, "w") as f:
+            for ch in range(n_channels):
+                data = np.empty((n_profiles, n_heights), dtype=np.complex64)
+                data.real = rng.standard_normal((n_profiles, n_heights), dtype=np.float32)
+                data.imag = rng.standard_normal((n_profiles, n_heights), dtype=np.float32)
+                data *= noise_scale
+                data += layer * (echo * channel_phase[ch])[:, np.newaxis]
+                f[CHANNEL_FMT.format(ch)] = data
+            f["Data/utctime"] = t
+            f["Metadata/heightList"] = heights_km * 1000.0
+        paths.append(path)
+
+    log.info(f"🧪 {n_files} archivos sintéticos en {output_dir} "
+             f"({n_channels} canales, {n_profiles} perfiles, {n_heights} alturas)")
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera archivos HDF5 sintéticos del radar AMISR-14.")
+    parser.add_argument("--output", required=True, help="Carpeta de salida")
+    parser.add_argument("--files", type=int, default=3, help="Número de archivos")
+    parser.add_argument("--channels", type=int, default=1, help="Número de canales")
+    parser.add_argument("--profiles", type=int, default=1000, help="Perfiles por archivo")
+    parser.add_argument("--heights", type=int, default=200, help="Número de alturas")
+    parser.add_argument("--ipp", type=float, default=0.005, help="IPP en segundos")
+    parser.add_argument("--snr", type=float, default=10.0, help="SNR del eco (dB)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla aleatoria")
+    args = parser.parse_args()
+
+    write_synthetic_files(args.output, n_files=args.files, n_channels=args.channels,
+                          n_profiles=args.profiles, n_heights=args.heights,
+                          ipp_seconds=args.ipp, snr_db=args.snr, seed=args.seed)
@@ -2,7 +2,8 @@ from process_amisr14_sequence import AMISR14Sequence
 from animate_spectrum_sequence import animate_spectrum_sequence
 
 # Cargar secuencia completa
-seq = AMISR14Sequence("/home/soporte/Documents/readerHDF5/raw_data/volts_sinDECO")
+seq = AMISR14Sequence("/home/soporte/Documents/readerHDF5/raw_data/volts_sinDECO",
+                      cache="/home/soporte/Documents/readerHDF5/cache")
 
 # Parámetros del radar
 ipp_seconds = 0.005    # 5 ms entre perfiles
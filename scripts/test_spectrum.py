@@ -2,7 +2,8 @@ from process_amisr14_sequence import AMISR14Sequence
 from plot_spectrum_block import plot_spectrum_block
 
 # Cargar secuencia
-seq = AMISR14Sequence("/home/soporte/Documents/readerHDF5/raw_data/volts_conDECO")
+seq = AMISR14Sequence("/home/soporte/Documents/readerHDF5/raw_data/volts_conDECO",
+                      cache="/home/soporte/Documents/readerHDF5/cache")
 
 # Ejecutar FFT con 64 perfiles
 fft_blocks = seq.process_by_blocks("getFFT", block_size=64, nfft=64)
@@ -18,5 +19,6 @@ plot_spectrum_block(
     ipp_seconds=ipp_seconds,
     radar_freq_hz=radar_freq_hz,
     block_index=0,
-    xunits="m/s"
+    xunits="m/s",
+    n_coh=seq.n_coh
 )
\ No newline at end of file